@@ -1,7 +1,10 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
+from apps.utils.admin import PerformanceModeAdminMixin
+
 from . import models, forms
 from .forms import AuthenticationForm
 
@@ -11,7 +14,7 @@ admin.site.login_form = AuthenticationForm
 
 # Register your models here.
 @admin.register(models.User)
-class UserAdmin(UserAdmin):
+class UserAdmin(PerformanceModeAdminMixin, UserAdmin):
     add_form = forms.CreateUserForm
     add_form_template = "admin/accounts/user/add_form.html"
     list_display = (
@@ -23,10 +26,10 @@ class UserAdmin(UserAdmin):
         "date_joined",
     )
     search_fields = (
-        "uuid",
-        "email",
-        "first_name",
-        "last_name",
+        "=uuid",
+        "^email",
+        "^first_name",
+        "^last_name",
     )
     ordering = ("-date_joined",)
     readonly_fields = (
@@ -69,3 +72,15 @@ class UserAdmin(UserAdmin):
             },
         ),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search with the full-text index, see User.objects.search(). Results
+        are ordered best match first, unless sorted by a column.
+        """
+        if not search_term.strip():
+            return queryset, False
+        results = queryset.search(search_term)
+        if ORDER_VAR in request.GET:
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
@@ -1,12 +1,120 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend as DjangoModelBackend
-from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.validators import validate_email
 
+from .hashers import check_password, make_password
+from .managers import CLEAR_CACHED_USERS_MAX
+from .ratelimit import check_login_rate
+
 
 UserModel = get_user_model()
 
 
+PERMISSIONS_VERSION_KEY = "accounts:permissions-version"
+USERS_VERSION_KEY = "accounts:users-version"
+
+
+def get_user_cache_key(user_id):
+    return "accounts:user:%s" % user_id
+
+
+def get_users_version():
+    # Random rather than a counter, so that a version that got evicted doesn't
+    # make users cached before it was bumped valid again.
+    return cache.get_or_set(USERS_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def dump_user(user):
+    """
+    Return what get_user() caches of a user: every field but the password,
+    and the session auth hash that Django checks against the session.
+    """
+    values = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != "password"
+    }
+    return (user._state.db, values, user.get_session_auth_hash())
+
+
+def load_user(data):
+    db, values, session_auth_hash = data
+    # The password is loaded from the database if it's accessed
+    user = UserModel.from_db(db, list(values), list(values.values()))
+    user._session_auth_hash = session_auth_hash
+    return user
+
+
+def load_cached_user(values, key):
+    """
+    Return the user in the values of cache.get_many([USERS_VERSION_KEY, key]),
+    or None if it isn't cached with the current version.
+    """
+    version = values.get(USERS_VERSION_KEY)
+    data = values.get(key)
+    if version is None or data is None or data[0] != version:
+        return None
+    return load_user(data[1])
+
+
+def clear_cached_users(user_ids):
+    """
+    Clear the cached users and permissions of the given users, or of every
+    user if there are more than CLEAR_CACHED_USERS_MAX of them.
+    """
+    if len(user_ids) > CLEAR_CACHED_USERS_MAX:
+        cache.set(USERS_VERSION_KEY, uuid.uuid4().hex, None)
+        clear_cached_permissions()
+        return
+    version = get_permissions_version()
+    keys = [get_user_cache_key(user_id) for user_id in user_ids]
+    keys += [get_permissions_cache_key(user_id, version) for user_id in user_ids]
+    cache.delete_many(keys)
+
+
+def clean_email(username):
+    """
+    Return username as a normalized email address, or None if it isn't one.
+    """
+    # Emails are stored normalized, so lookups are an exact match on the
+    # email column's unique index.
+    email = UserModel._default_manager.normalize_email(username)
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def get_permissions_version():
+    return cache.get_or_set(PERMISSIONS_VERSION_KEY, 1, None)
+
+
+def get_permissions_cache_key(user_id, version=None):
+    if version is None:
+        version = get_permissions_version()
+    return "accounts:permissions:%s:%s" % (version, user_id)
+
+
+def clear_cached_permissions(user_id=None):
+    """
+    Clear the cached permissions of a user, or of every user if no user is
+    given, e.g. after a group's permissions change.
+    """
+    if user_id is not None:
+        cache.delete(get_permissions_cache_key(user_id))
+        return
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        cache.set(PERMISSIONS_VERSION_KEY, 1, None)
+
+
 class ModelBackend(DjangoModelBackend):
 
     def authenticate(self, request, username=None, password=None, **kwargs):
@@ -17,19 +125,77 @@ class ModelBackend(DjangoModelBackend):
         """
         if username is None:
             username = kwargs.get(UserModel.EMAIL_FIELD)
-        try:
-            validate_email(username)
-        except ValidationError:
+        email = clean_email(username)
+        if email is None:
             return
-        else:
-            filter_params = {UserModel.EMAIL_FIELD: username}
+        if not check_login_rate(request, email):
+            # Stops authentication before any password is hashed
+            raise PermissionDenied
+        filter_params = {UserModel.EMAIL_FIELD: email}
 
         try:
             user = UserModel._default_manager.get(**filter_params)
         except UserModel.DoesNotExist:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user (#20760).
-            UserModel().set_password(password)
+            make_password(password)
         else:
-            if user.check_password(password) and self.user_can_authenticate(user):
+            if check_password(user, password) and self.user_can_authenticate(user):
                 return user
+
+    def get_user(self, user_id):
+        """
+        Return the user, cached for AUTH_USER_CACHE_SECONDS without their
+        password (see dump_user()). The cached user is cleared whenever the
+        user is saved, updated or deleted, e.g. after a password change.
+        """
+        if not settings.AUTH_USER_CACHE_SECONDS:
+            return super().get_user(user_id)
+        key = get_user_cache_key(user_id)
+        values = cache.get_many([USERS_VERSION_KEY, key])
+        user = load_cached_user(values, key)
+        if user is None:
+            version = values.get(USERS_VERSION_KEY) or get_users_version()
+            try:
+                user = UserModel._default_manager.get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            data = (version, dump_user(user))
+            cache.set(key, data, settings.AUTH_USER_CACHE_SECONDS)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_SECONDS:
+            return await super().aget_user(user_id)
+        key = get_user_cache_key(user_id)
+        values = await cache.aget_many([USERS_VERSION_KEY, key])
+        user = load_cached_user(values, key)
+        if user is None:
+            version = values.get(USERS_VERSION_KEY) or await cache.aget_or_set(
+                USERS_VERSION_KEY, lambda: uuid.uuid4().hex, None
+            )
+            try:
+                user = await UserModel._default_manager.aget(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            data = (version, dump_user(user))
+            await cache.aset(key, data, settings.AUTH_USER_CACHE_SECONDS)
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        """
+        Return the user's permissions, cached for AUTH_PERMISSION_CACHE_SECONDS
+        across requests.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if settings.AUTH_PERMISSION_CACHE_SECONDS and not hasattr(
+            user_obj, "_perm_cache"
+        ):
+            key = get_permissions_cache_key(user_obj.pk)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, settings.AUTH_PERMISSION_CACHE_SECONDS)
+            user_obj._perm_cache = perms
+        return super().get_all_permissions(user_obj)
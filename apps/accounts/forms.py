@@ -4,6 +4,8 @@ from django.contrib.auth.forms import AuthenticationForm as DjangoAuthentication
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import validate_email
 
+from .ratelimit import is_login_rate_limited
+
 
 User = get_user_model()
 
@@ -14,6 +16,7 @@ class AuthenticationForm(DjangoAuthenticationForm):
             "Please enter a correct %(username)s and password. Note that both "
             "fields may be case-sensitive."
         ),
+        "rate_limited": _("Too many login attempts. Please try again later."),
     }
 
     def __init__(self, request=None, *args, **kwargs):
@@ -49,7 +52,14 @@ class AuthenticationForm(DjangoAuthenticationForm):
                 username=username,
                 password=password,
             )
-            if self.user_cache is None:
+            if self.user_cache is None and is_login_rate_limited(
+                self.request, User.objects.normalize_email(username)
+            ):
+                raise forms.ValidationError(
+                    self.error_messages["rate_limited"],
+                    code="rate_limited",
+                )
+            elif self.user_cache is None:
                 raise forms.ValidationError(
                     self.error_messages["invalid_login"],
                     code="invalid_login",
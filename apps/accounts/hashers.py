@@ -0,0 +1,39 @@
+import functools
+import threading
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+@functools.cache
+def get_hashing_semaphore():
+    return threading.BoundedSemaphore(settings.PASSWORD_HASHING_CONCURRENCY)
+
+
+@receiver(setting_changed)
+def clear_hashing_semaphore(*, setting, **kwargs):
+    if setting == "PASSWORD_HASHING_CONCURRENCY":
+        get_hashing_semaphore.cache_clear()
+
+
+def check_password(user, password):
+    """
+    Like user.check_password(), which also rehashes the password if its
+    hasher or costs changed, but waits while PASSWORD_HASHING_CONCURRENCY
+    other threads of the process are hashing. Under ASGI, each request runs
+    its sync code, e.g. authenticate(), in a thread of its own, so a burst of
+    logins would otherwise hash every password at once.
+    """
+    with get_hashing_semaphore():
+        return user.check_password(password)
+
+
+def make_password(password):
+    """
+    See django.contrib.auth.hashers.make_password(). Bounded like
+    check_password().
+    """
+    with get_hashing_semaphore():
+        return hashers.make_password(password)
@@ -0,0 +1,96 @@
+import contextlib
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from .importusers import FIELDS, FORMATS
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Write users to a CSV or JSON Lines file in the format importusers "
+        "reads, streaming them from the database in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            action="store",
+            dest="format",
+            choices=FORMATS,
+            default="csv",
+            help="Format of the output. Default is csv.",
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            action="store",
+            dest="output",
+            help="File to write to. Defaults to stdout.",
+        )
+        parser.add_argument(
+            "--password-hashes",
+            action="store_true",
+            dest="password_hashes",
+            help="Include the users' password hashes.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            type=int,
+            default=2000,
+            help="Number of users to fetch per query. Default is 2000.",
+        )
+        parser.add_argument(
+            "--database",
+            action="store",
+            dest="database",
+            default=DEFAULT_DB_ALIAS,
+            help='Specifies the database to use. Default is "default".',
+        )
+
+    def handle(self, *args, **options):
+        fields = ["email", *FIELDS]
+        columns = list(fields)
+        if options["password_hashes"]:
+            fields.append("password")
+            columns.append("password_hash")
+        queryset = (
+            UserModel._default_manager.using(options["database"])
+            .order_by("pk")
+            .values_list(*fields)
+        )
+
+        if options["output"]:
+            file = open(options["output"], "w", newline="", encoding="utf-8")
+        else:
+            file = contextlib.nullcontext(self.stdout)
+        with file as file:
+            if options["format"] == "csv":
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                write = writer.writerow
+            else:
+
+                def write(values):
+                    file.write(json.dumps(dict(zip(columns, values))) + "\n")
+
+            count = 0
+            for values in queryset.iterator(chunk_size=options["batch_size"]):
+                write(self.serialize(values))
+                count += 1
+
+        if options["output"] and options["verbosity"] >= 1:
+            self.stdout.write("Exported %s user(s)." % count)
+
+    def serialize(self, values):
+        return [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in values
+        ]
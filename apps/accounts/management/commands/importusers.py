@@ -0,0 +1,206 @@
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+
+UserModel = get_user_model()
+
+FORMATS = ("csv", "jsonl")
+FIELDS = ("first_name", "last_name", "is_active", "is_staff", "date_joined")
+BOOLEAN_FIELDS = ("is_active", "is_staff")
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV or JSON Lines file, read and saved in batches. "
+        "Rows need an email column, and may have password (raw), "
+        "password_hash (already hashed), %s columns. Users whose email "
+        "already exists are skipped." % ", ".join(FIELDS)
+    )
+    requires_migrations_checks = True
+    # multiprocessing context of the hashing processes, None for the default
+    mp_context = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help='File to import, or "-" to read from stdin.',
+        )
+        parser.add_argument(
+            "--format",
+            action="store",
+            dest="format",
+            choices=FORMATS,
+            help="Format of the file. Defaults to the file's extension, or csv.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            type=int,
+            default=1000,
+            help="Number of users to create per query. Default is 1000.",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store",
+            dest="processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes to hash passwords in. Default is one per CPU.",
+        )
+        parser.add_argument(
+            "--database",
+            action="store",
+            dest="database",
+            default=DEFAULT_DB_ALIAS,
+            help='Specifies the database to use. Default is "default".',
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"]
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lstrip(".")
+            file_format = extension if extension in FORMATS else "csv"
+
+        self.processes = options["processes"]
+        # Hashers are picklable, so the processes hash with this process's
+        # hasher whether they're forked or spawned with their own settings.
+        self.make_password = partial(make_password, hasher=get_hasher())
+        counts = {"created": 0, "existing": 0, "invalid": 0}
+        if path == "-":
+            file = contextlib.nullcontext(sys.stdin)
+        else:
+            file = open(path, newline="", encoding="utf-8")
+        # Hashing is CPU bound, so it's spread over processes
+        with file as file, ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self.mp_context,
+            initializer=django.setup,
+        ) as executor:
+            rows = self.read_rows(file, file_format)
+            while True:
+                batch = list(itertools.islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+                self.import_batch(batch, executor, options["database"], counts)
+                if options["verbosity"] >= 2:
+                    self.stdout.write("Read %s row(s)." % sum(counts.values()))
+
+        if options["verbosity"] >= 1:
+            self.stdout.write(
+                "Created %(created)s user(s), skipped %(existing)s existing "
+                "user(s) and %(invalid)s invalid row(s)." % counts
+            )
+
+    def read_rows(self, file, file_format):
+        """
+        Yield the line number and a dict of each row in the file.
+        """
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_num, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except ValueError as e:
+                raise CommandError("Line %s: %s" % (line_num, e))
+
+    def build_user(self, line_num, row):
+        """
+        Return an unsaved user and the raw password to hash for a row, or None
+        for invalid rows.
+        """
+        email = UserModel._default_manager.normalize_email(row.get("email"))
+        if not email:
+            self.stderr.write("Line %s: invalid email." % line_num)
+            return None
+        user = UserModel(email=email)
+        for field in FIELDS:
+            value = row.get(field)
+            if value in (None, ""):
+                continue
+            if field in BOOLEAN_FIELDS and isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes")
+            setattr(user, field, value)
+        try:
+            # The password is hashed later on
+            user.clean_fields(exclude=["password"])
+        except ValidationError as e:
+            errors = [
+                "%s: %s" % (field, " ".join(messages))
+                for field, messages in e.message_dict.items()
+            ]
+            self.stderr.write("Line %s: %s" % (line_num, " ".join(errors)))
+            return None
+
+        if row.get("password_hash"):
+            try:
+                identify_hasher(row["password_hash"])
+            except ValueError:
+                self.stderr.write("Line %s: unknown password hash." % line_num)
+                return None
+            user.password = row["password_hash"]
+        return user, row.get("password") or None
+
+    def get_existing_emails(self, manager, emails):
+        return set(manager.filter(email__in=emails).values_list("email", flat=True))
+
+    def import_batch(self, batch, executor, database, counts):
+        users = {}
+        for line_num, row in batch:
+            result = self.build_user(line_num, row)
+            if result is None:
+                counts["invalid"] += 1
+            elif result[0].email in users:
+                counts["existing"] += 1
+            else:
+                users[result[0].email] = result
+
+        manager = UserModel._default_manager.db_manager(database)
+        existing = self.get_existing_emails(manager, list(users))
+        counts["existing"] += len(existing)
+        users = [result for email, result in users.items() if email not in existing]
+
+        to_hash = [(user, password) for user, password in users if not user.password]
+        hashes = executor.map(
+            self.make_password,
+            [password for user, password in to_hash],
+            chunksize=max(1, len(to_hash) // (self.processes * 4)),
+        )
+        for (user, password), encoded in zip(to_hash, hashes):
+            user.password = encoded
+
+        objs = [user for user, password in users]
+        while objs:
+            try:
+                with transaction.atomic(using=database):
+                    manager.bulk_create(objs)
+            except IntegrityError:
+                # Users created since the existing emails were read
+                created = self.get_existing_emails(
+                    manager, [user.email for user in objs]
+                )
+                if not created:
+                    raise
+                counts["existing"] += len(created)
+                objs = [user for user in objs if user.email not in created]
+            else:
+                break
+        counts["created"] += len(objs)
@@ -1,7 +1,74 @@
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models, router, transaction
+
+from .search import search_users
+
+
+# Set while UserQuerySet.bulk_update() runs
+bulk_updating = ContextVar("bulk_updating", default=False)
+
+# Above this many users, clear_cached_users() invalidates every cached user
+# instead of deleting each user's keys.
+CLEAR_CACHED_USERS_MAX = 100
+
+
+def users_are_cached():
+    return bool(
+        settings.AUTH_USER_CACHE_SECONDS or settings.AUTH_PERMISSION_CACHE_SECONDS
+    )
+
+
+def clear_cached_users_on_commit(user_ids, using):
+    # The backends module imports the user model
+    from .backends import clear_cached_users
+
+    transaction.on_commit(partial(clear_cached_users, user_ids), using=using)
+
+
+class UserQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """
+        Also clear the cached users of the updated rows, since update()
+        doesn't send signals.
+        """
+        if not users_are_cached() or bulk_updating.get():
+            return super().update(**kwargs)
+        db = self._db or router.db_for_write(self.model, **self._hints)
+        # More ids than that clear every cached user, so the rest isn't loaded
+        user_ids = self.using(db).values_list("pk", flat=True)
+        user_ids = list(user_ids[: CLEAR_CACHED_USERS_MAX + 1])
+        rows = super().update(**kwargs)
+        clear_cached_users_on_commit(user_ids, db)
+        return rows
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # Clears the cached users of objs, instead of each update() query
+        # looking up the ids of the rows it updates.
+        objs = list(objs)
+        token = bulk_updating.set(True)
+        try:
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+        finally:
+            bulk_updating.reset(token)
+        if users_are_cached():
+            db = self._db or router.db_for_write(self.model, **self._hints)
+            clear_cached_users_on_commit([obj.pk for obj in objs], db)
+        return rows
+
+    def search(self, q):
+        """
+        Return the users matching the search query q, best matches first. See
+        apps.accounts.search.search_users().
+        """
+        return search_users(self, q)
 
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
     @classmethod
@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.mail import send_mail
 
 from .managers import UserManager
+from .search import SearchDocumentField
 
 
 # Create your models here.
@@ -39,7 +40,10 @@ class User(AbstractBaseUser, PermissionsMixin):
             "Unselect this instead of deleting accounts."
         ),
     )
-    date_joined = models.DateTimeField(_("date joined"), default=timezone.now)
+    # Indexed for the default ordering
+    date_joined = models.DateTimeField(
+        _("date joined"), default=timezone.now, db_index=True
+    )
 
     objects = UserManager()
 
@@ -60,6 +64,21 @@ class User(AbstractBaseUser, PermissionsMixin):
         super().clean()
         self.email = self.__class__.objects.normalize_email(self.email)
 
+    def save(self, *args, **kwargs):
+        # ModelBackend looks users up by their normalized email
+        if self.email:
+            self.email = (
+                self.__class__.objects.normalize_email(self.email) or self.email
+            )
+        super().save(*args, **kwargs)
+
+    def get_session_auth_hash(self):
+        # Users cached by ModelBackend.get_user() are loaded without their
+        # password, but with the hash it had when they were cached.
+        if "password" not in self.__dict__ and hasattr(self, "_session_auth_hash"):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
     def get_email(self):
         """Return the email for this User."""
         return getattr(self, self.EMAIL_FIELD)
@@ -78,3 +97,36 @@ class User(AbstractBaseUser, PermissionsMixin):
     def email_user(self, subject, message, from_email=None, **kwargs):
         """Send an email to this user."""
         send_mail(subject, message, from_email, [self.email], **kwargs)
+
+
+class UserSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table of users created by install_user_search(), for
+    joining it in search_users().
+    """
+
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_index",
+    )
+    document = SearchDocumentField(db_column="accounts_user_search")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "accounts_user_search"
+
+
+class LoginAttemptCount(models.Model):
+    """
+    Login attempts counted in a rate limit window, when the default cache
+    can't count atomically. See apps.accounts.ratelimit.
+    """
+
+    key = models.CharField(max_length=150, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
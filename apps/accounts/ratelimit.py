@@ -0,0 +1,209 @@
+"""
+Sliding window rate limiting of login attempts, keyed by client IP address
+and by email address.
+
+Counts are kept in the default cache if it can increment atomically, e.g.
+Redis. Otherwise, e.g. with the file cache, whose incr() is a get() then a
+set() that also resets the timeout, concurrent attempts would overwrite each
+other's counts, so they're kept in the database instead. If counting fails,
+each process falls back to counting in memory.
+"""
+
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import PyLibMCCache, PyMemcacheCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+local_cache = LocMemCache("accounts-ratelimit", {})
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_counters():
+    """
+    Return the number of attempts, limited attempts and times the in-memory
+    fallback was used, counted by this process.
+    """
+    with _counters_lock:
+        return {name: _counters[name] for name in ("attempts", "limited", "fallbacks")}
+
+
+def reset_counters():
+    with _counters_lock:
+        _counters.clear()
+
+
+# Cache backends whose incr() is atomic and keeps the key's timeout.
+# LocMemCache's only is within a process.
+ATOMIC_CACHES = (RedisCache, PyMemcacheCache, PyLibMCCache, LocMemCache)
+
+
+class CacheCounts:
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def incr(self, key, timeout):
+        self.backend.add(key, 0, timeout)
+        return self.backend.incr(key)
+
+    def get_many(self, keys):
+        return self.backend.get_many(keys)
+
+
+class DatabaseCounts:
+    """
+    Counts kept in LoginAttemptCount rows. Incremented with an UPDATE, so
+    concurrent attempts are all counted.
+    """
+
+    def __init__(self):
+        from .models import LoginAttemptCount
+
+        self.model = LoginAttemptCount
+        # Reads too, so they never see a replica's stale counts
+        self.db = router.db_for_write(LoginAttemptCount)
+
+    def incr(self, key, timeout):
+        counts = self.model.objects.using(self.db).filter(key=key)
+        with transaction.atomic(using=self.db):
+            if not counts.update(count=F("count") + 1):
+                try:
+                    with transaction.atomic(using=self.db):
+                        expires_at = timezone.now() + datetime.timedelta(
+                            seconds=timeout
+                        )
+                        self.model.objects.using(self.db).create(
+                            key=key, count=1, expires_at=expires_at
+                        )
+                except IntegrityError:
+                    # Created by a concurrent attempt
+                    counts.update(count=F("count") + 1)
+            return counts.values_list("count", flat=True).get()
+
+    def get_many(self, keys):
+        return dict(
+            self.model.objects.using(self.db)
+            .filter(key__in=keys, expires_at__gt=timezone.now())
+            .values_list("key", "count")
+        )
+
+    @classmethod
+    def clear_expired(cls):
+        """
+        Delete the expired counts. Return the number of deleted counts.
+        """
+        counts = cls()
+        return (
+            counts.model.objects.using(counts.db)
+            .filter(expires_at__lte=timezone.now())
+            .delete()[0]
+        )
+
+
+def get_counts():
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], ATOMIC_CACHES):
+        return CacheCounts(cache)
+    return DatabaseCounts()
+
+
+def _get_window_counts(counts, key, period, now, hit):
+    window = int(now // period)
+    current_key = "accounts:ratelimit:%s:%s" % (key, window)
+    previous_key = "accounts:ratelimit:%s:%s" % (key, window - 1)
+    if hit:
+        current = counts.incr(current_key, period * 2)
+        previous = counts.get_many([previous_key]).get(previous_key, 0)
+    else:
+        values = counts.get_many([current_key, previous_key])
+        current = values.get(current_key, 0)
+        previous = values.get(previous_key, 0)
+    # Weigh the previous window by how much of it overlaps the sliding window
+    elapsed = (now % period) / period
+    return previous * (1 - elapsed) + current
+
+
+def get_rate(key, period, hit=True):
+    """
+    Return the number of attempts for the key in the last period seconds,
+    counting one more attempt first if hit is True.
+    """
+    now = time.time()
+    try:
+        return _get_window_counts(get_counts(), key, period, now, hit)
+    except Exception:
+        logger.warning("Rate limiting in memory, counting failed.", exc_info=True)
+        _count("fallbacks")
+        return _get_window_counts(CacheCounts(local_cache), key, period, now, hit)
+
+
+def get_client_ip(request):
+    """
+    Return the client IP address from the CLIENT_IP_HEADER request header,
+    falling back to REMOTE_ADDR.
+    """
+    if settings.CLIENT_IP_HEADER and settings.CLIENT_IP_HEADER in request.META:
+        return request.META[settings.CLIENT_IP_HEADER]
+    return request.META.get("REMOTE_ADDR")
+
+
+def _get_login_keys(request, email):
+    keys = []
+    if request is not None:
+        keys.append(("ip", get_client_ip(request)))
+    if email:
+        keys.append(("email", email.lower()))
+    return [
+        (scope, "%s:%s" % (scope, hashlib.sha256(value.encode()).hexdigest()))
+        for scope, value in keys
+        if value
+    ]
+
+
+def check_login_rate(request, email):
+    """
+    Count a login attempt and return False if the client IP address or email
+    address exceeded its LOGIN_RATE_LIMITS. Call before hashing a password.
+    """
+    _count("attempts")
+    allowed = True
+    for scope, key in _get_login_keys(request, email):
+        limit, period = settings.LOGIN_RATE_LIMITS[scope]
+        if get_rate(key, period) > limit:
+            allowed = False
+    if not allowed:
+        _count("limited")
+    return allowed
+
+
+def is_login_rate_limited(request, email):
+    """
+    Return whether the last login attempt from the client IP address or for
+    the email address exceeded its LOGIN_RATE_LIMITS, without counting an
+    attempt.
+    """
+    for scope, key in _get_login_keys(request, email):
+        limit, period = settings.LOGIN_RATE_LIMITS[scope]
+        if get_rate(key, period, hit=False) > limit:
+            return True
+    return False
@@ -1,2 +1,53 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import transaction
 from django.dispatch import receiver
 from django.db.models import signals as django_signals
+
+from .backends import clear_cached_permissions, get_user_cache_key
+from .search import install_user_search
+
+
+UserModel = get_user_model()
+
+
+@receiver(django_signals.post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(django_signals.post_delete, sender=settings.AUTH_USER_MODEL)
+def clear_cached_user(sender, instance, using, **kwargs):
+    # Once committed, so other requests can't cache the old row in between
+    transaction.on_commit(
+        partial(cache.delete, get_user_cache_key(instance.pk)), using=using
+    )
+    # e.g. is_superuser or is_active changed
+    transaction.on_commit(partial(clear_cached_permissions, instance.pk), using=using)
+
+
+@receiver(django_signals.m2m_changed, sender=UserModel.groups.through)
+@receiver(django_signals.m2m_changed, sender=UserModel.user_permissions.through)
+@receiver(django_signals.m2m_changed, sender=Group.permissions.through)
+def clear_cached_permissions_on_m2m_changed(sender, instance, action, using, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, UserModel):
+        user_id = instance.pk
+    else:
+        # A group or permission changed, which may affect any user
+        user_id = None
+    transaction.on_commit(partial(clear_cached_permissions, user_id), using=using)
+
+
+@receiver(django_signals.post_save, sender=Permission)
+@receiver(django_signals.post_delete, sender=Permission)
+@receiver(django_signals.post_delete, sender=Group)
+def clear_all_cached_permissions(sender, using, **kwargs):
+    transaction.on_commit(clear_cached_permissions, using=using)
+
+
+@receiver(django_signals.post_migrate)
+def install_user_search_index(sender, using, **kwargs):
+    if sender.label == UserModel._meta.app_label:
+        install_user_search(UserModel, using)
@@ -0,0 +1,210 @@
+"""
+Full-text search of users by name and email address.
+
+On SQLite, an FTS5 table indexes the users table and is kept in sync by
+triggers. On PostgreSQL, a GIN index on a tsvector expression does the
+same. Both are created by install_user_search() after migrate. Other
+databases fall back to prefix matching.
+"""
+
+import re
+import uuid
+
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Lookup, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.text import smart_split, unescape_string_literal
+
+
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+SQLITE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS %(search_table)s USING fts5("
+    "%(columns)s, content=%(table)s, content_rowid=%(pk)s, prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS %(search_table_name)s_insert "
+    "AFTER INSERT ON %(table)s BEGIN "
+    "INSERT INTO %(search_table)s(rowid, %(columns)s) "
+    "VALUES (new.%(pk)s, %(new_columns)s); END",
+    "CREATE TRIGGER IF NOT EXISTS %(search_table_name)s_delete "
+    "AFTER DELETE ON %(table)s BEGIN "
+    "INSERT INTO %(search_table)s(%(search_table)s, rowid, %(columns)s) "
+    "VALUES ('delete', old.%(pk)s, %(old_columns)s); END",
+    "CREATE TRIGGER IF NOT EXISTS %(search_table_name)s_update "
+    "AFTER UPDATE OF %(columns)s ON %(table)s BEGIN "
+    "INSERT INTO %(search_table)s(%(search_table)s, rowid, %(columns)s) "
+    "VALUES ('delete', old.%(pk)s, %(old_columns)s); "
+    "INSERT INTO %(search_table)s(rowid, %(columns)s) "
+    "VALUES (new.%(pk)s, %(new_columns)s); END",
+]
+
+# Must match the indexed expression exactly for the index to be used
+POSTGRESQL_DOCUMENT = "to_tsvector('simple', %s)"
+
+
+class SearchDocumentField(TextField):
+    """
+    The hidden column of an FTS5 table that's named after the table, which
+    full-text queries match against, e.g. filter(document__match=query).
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return "%s MATCH %s" % (lhs, rhs), [*lhs_params, *rhs_params]
+
+
+def get_search_table_name(model):
+    return "%s_search" % model._meta.db_table
+
+
+def get_postgresql_document(model, connection):
+    table = connection.ops.quote_name(model._meta.db_table)
+    return POSTGRESQL_DOCUMENT % " || ' ' || ".join(
+        "coalesce(%s.%s, '')" % (table, connection.ops.quote_name(field))
+        for field in SEARCH_FIELDS
+    )
+
+
+def install_user_search(model, using):
+    """
+    Create the search index for the model's table if it doesn't exist yet.
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    search_table_name = get_search_table_name(model)
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            names = {
+                "table": quote_name(model._meta.db_table),
+                "search_table": quote_name(search_table_name),
+                "search_table_name": search_table_name,
+                "pk": quote_name(model._meta.pk.column),
+                "columns": ", ".join(quote_name(field) for field in SEARCH_FIELDS),
+                "new_columns": ", ".join(
+                    "new.%s" % quote_name(field) for field in SEARCH_FIELDS
+                ),
+                "old_columns": ", ".join(
+                    "old.%s" % quote_name(field) for field in SEARCH_FIELDS
+                ),
+            }
+            exists = search_table_name in connection.introspection.table_names(cursor)
+            for statement in SQLITE_STATEMENTS:
+                cursor.execute(statement % names)
+            if not exists:
+                # Index the existing users
+                cursor.execute(
+                    "INSERT INTO %(search_table)s(%(search_table)s) "
+                    "VALUES ('rebuild')" % names
+                )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS %s ON %s USING GIN (%s)"
+                % (
+                    quote_name(search_table_name),
+                    quote_name(model._meta.db_table),
+                    get_postgresql_document(model, connection),
+                )
+            )
+
+
+def get_search_terms(q):
+    """
+    Split the search query into words, keeping quoted phrases together.
+    """
+    terms = []
+    for term in smart_split(q):
+        if term.startswith(('"', "'")) and term[0] == term[-1] and len(term) > 1:
+            term = unescape_string_literal(term)
+        if re.search(r"\w", term):
+            terms.append(term)
+    return terms
+
+
+def get_email_query(term):
+    """
+    Return a query matching a search term that is a full email address
+    exactly, or one ending with "@" by prefix, or None for other terms. Both
+    can use the email index.
+    """
+    if "@" in term.strip("@"):
+        # The model's manager imports this module
+        from django.contrib.auth import get_user_model
+
+        return Q(email=get_user_model().objects.normalize_email(term))
+    if term.endswith("@"):
+        # A range rather than LIKE, which can't use the index
+        return Q(email__gte=term, email__lt=term + "\uffff")
+    return None
+
+
+def search_users(queryset, q):
+    """
+    Filter the queryset to users whose name or email address contains every
+    word of q, each matched by prefix. Results are annotated with
+    search_rank, lower being a better match, and ordered by it. A UUID
+    matches the user with that UUID, and email addresses are matched
+    exactly, see get_email_query().
+    """
+    try:
+        user_uuid = uuid.UUID(q.strip())
+    except ValueError:
+        pass
+    else:
+        return queryset.filter(uuid=user_uuid).annotate(search_rank=Value(0.0))
+
+    terms = []
+    email_queries = []
+    for term in get_search_terms(q):
+        email_query = get_email_query(term)
+        if email_query is None:
+            terms.append(term)
+        else:
+            email_queries.append(email_query)
+    if not terms and not email_queries:
+        return queryset.none().annotate(search_rank=Value(0.0))
+    queryset = queryset.filter(*email_queries)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0)).order_by("search_rank")
+    model = queryset.model
+    connection = connections[queryset.db]
+
+    if connection.vendor == "sqlite":
+        match = " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+        # Joins the FTS5 table, see UserSearchIndex, so the MATCH runs once
+        # and ranks every match.
+        queryset = queryset.filter(search_index__document__match=match).annotate(
+            search_rank=F("search_index__rank")
+        )
+    elif connection.vendor == "postgresql":
+        document = get_postgresql_document(model, connection)
+        query = " & ".join(
+            "'%s':*" % term.replace("\\", "\\\\").replace("'", "''") for term in terms
+        )
+        queryset = queryset.filter(
+            RawSQL(
+                "%s @@ to_tsquery('simple', %%s)" % document,
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                "-ts_rank(%s, to_tsquery('simple', %%s))" % document,
+                [query],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        for term in terms:
+            queryset = queryset.filter(
+                Q.create(
+                    [("%s__istartswith" % field, term) for field in SEARCH_FIELDS],
+                    connector=Q.OR,
+                )
+            )
+        queryset = queryset.annotate(search_rank=Value(0.0))
+    return queryset.order_by("search_rank")
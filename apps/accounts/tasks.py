@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .ratelimit import DatabaseCounts
+
+
+@shared_task
+def clear_expired_login_attempt_counts():
+    """
+    Delete the login attempt counts of past rate limit windows, which are only
+    kept in the database when the cache can't count atomically.
+    """
+    return DatabaseCounts.clear_expired()
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.utils.admin import EstimatedCountPaginator
+
+
+UserModel = get_user_model()
+
+
+class UserAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = UserModel.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        cls.john = UserModel.objects.create_user(
+            email="john@example.com", first_name="John", last_name="Smith"
+        )
+        cls.jane = UserModel.objects.create_user(
+            email="jane@example.org", first_name="Jane", last_name="Johnson"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+        self.url = reverse("admin:accounts_user_changelist")
+
+    def search(self, term):
+        response = self.client.get(self.url, {"q": term})
+        self.assertEqual(response.status_code, 200)
+        return set(response.context["cl"].result_list)
+
+    def test_search(self):
+        self.assertEqual(self.search(str(self.john.uuid)), {self.john})
+        self.assertEqual(self.search("john@EXAMPLE.com"), {self.john})
+        self.assertEqual(self.search("john@"), {self.john})
+        self.assertEqual(self.search("sMi"), {self.john})
+        self.assertEqual(self.search("jo"), {self.john, self.jane})
+        self.assertEqual(self.search("ja smi"), set())
+        self.assertEqual(self.search("'John' 'Smith'"), {self.john})
+        self.assertEqual(self.search("ohn"), set())
+
+    def test_search_ordering(self):
+        response = self.client.get(self.url, {"q": "john"})
+        # Johnson is a weaker match than John
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.john, self.jane]
+        )
+
+    def test_changelist(self):
+        response = self.client.get(self.url)
+        cl = response.context["cl"]
+        self.assertIsInstance(cl.paginator, EstimatedCountPaginator)
+        self.assertFalse(cl.show_full_result_count)
+        self.assertEqual(cl.result_count, 3)
+        self.assertEqual(
+            cl.result_list[0].get_deferred_fields(),
+            {"password", "last_login", "is_superuser", "is_active"},
+        )
+
+
+class EstimatedCountPaginatorTest(TestCase):
+
+    def test_count_capped(self):
+        for i in range(3):
+            UserModel.objects.create_user(email="user%s@example.com" % i)
+        paginator = EstimatedCountPaginator(UserModel.objects.all(), 1)
+        paginator.max_count = 2
+        self.assertEqual(paginator.count, 2)
+        self.assertEqual(paginator.num_pages, 2)
+        paginator = EstimatedCountPaginator(UserModel.objects.all(), 1)
+        self.assertEqual(paginator.count, 3)
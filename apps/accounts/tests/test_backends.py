@@ -0,0 +1,230 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.accounts.backends import (
+    ModelBackend,
+    clear_cached_permissions,
+    get_user_cache_key,
+)
+from apps.accounts.hashers import check_password, get_hashing_semaphore
+
+
+UserModel = get_user_model()
+
+
+class ModelBackendTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user(
+            email="User@Example.COM", password="password"
+        )
+
+    def setUp(self):
+        self.backend = ModelBackend()
+        self.request = RequestFactory().get("/")
+        # Also resets login rate limits
+        cache.clear()
+
+    def test_authenticate(self):
+        self.assertEqual(self.user.email, "User@example.com")
+        for username in ["User@example.com", " User@EXAMPLE.com "]:
+            with self.subTest(username=username):
+                self.assertEqual(
+                    self.backend.authenticate(self.request, username, "password"),
+                    self.user,
+                )
+        for username, password in [
+            ("user@example.com", "password"),
+            ("User@example.com", "wrong"),
+            ("not an email", "password"),
+            (None, "password"),
+        ]:
+            with self.subTest(username=username, password=password):
+                self.assertIsNone(
+                    self.backend.authenticate(self.request, username, password)
+                )
+
+    def test_authenticate_invalid_email(self):
+        for username in ["@example.com", "user @example.com", "user@"]:
+            with self.subTest(username=username):
+                with self.assertNumQueries(0):
+                    self.assertIsNone(
+                        self.backend.authenticate(self.request, username, "password")
+                    )
+
+    def test_authenticate_rehashes_password(self):
+        self.user.password = make_password("password", hasher="pbkdf2_sha1")
+        self.user.save()
+        user = self.backend.authenticate(self.request, "User@example.com", "password")
+        self.assertEqual(user.password.split("$")[0], get_hasher().algorithm)
+        user.refresh_from_db()
+        self.assertEqual(user.password.split("$")[0], get_hasher().algorithm)
+
+    @override_settings(PASSWORD_HASHING_CONCURRENCY=1)
+    def test_hashing_concurrency(self):
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(check_password(self.user, "password"))
+        )
+        with get_hashing_semaphore():
+            thread.start()
+            thread.join(0.2)
+            # Waiting for the other hash to finish
+            self.assertTrue(thread.is_alive())
+        thread.join()
+        self.assertEqual(results, [True])
+
+    def test_save_normalizes_email(self):
+        user = UserModel.objects.create(email="Other@EXAMPLE.com")
+        self.assertEqual(user.email, "Other@example.com")
+
+    def test_get_user_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user, self.user)
+            self.assertEqual(user.email, self.user.email)
+            self.assertEqual(
+                user.get_session_auth_hash(), self.user.get_session_auth_hash()
+            )
+        # The password isn't cached, but is loaded on access
+        self.assertNotIn(
+            self.user.password, repr(cache.get(get_user_cache_key(self.user.pk)))
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("password"))
+
+    def test_get_user_session_auth_hash_after_password_change(self):
+        self.backend.get_user(self.user.pk)
+        user = self.backend.get_user(self.user.pk)  # From the cache
+        old_hash = user.get_session_auth_hash()
+        user.set_password("changed")
+        self.assertNotEqual(user.get_session_auth_hash(), old_hash)
+
+    def test_get_user_cleared_on_update(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserModel.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_get_user_cleared_on_large_update(self):
+        other = UserModel.objects.create_user(email="other@example.com")
+        self.backend.get_user(self.user.pk)
+        self.backend.get_user(other.pk)
+        with mock.patch("apps.accounts.backends.CLEAR_CACHED_USERS_MAX", 1), mock.patch(
+            "apps.accounts.managers.CLEAR_CACHED_USERS_MAX", 1
+        ), self.captureOnCommitCallbacks(execute=True):
+            UserModel.objects.update(is_active=False)
+        # Every cached user was invalidated at once
+        self.assertIsNotNone(cache.get(get_user_cache_key(self.user.pk)))
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+        self.assertIsNone(self.backend.get_user(other.pk))
+
+    def test_get_user_cleared_on_bulk_update(self):
+        self.backend.get_user(self.user.pk)
+        self.user.password = make_password("changed")
+        with self.captureOnCommitCallbacks(execute=True):
+            UserModel.objects.bulk_update([self.user], ["password"])
+        self.assertIsNone(cache.get(get_user_cache_key(self.user.pk)))
+
+    def test_get_user_cleared_on_save(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("changed")
+            self.user.save()
+        user = self.backend.get_user(self.user.pk)
+        self.assertTrue(user.check_password("changed"))
+
+    def test_get_user_cleared_on_delete(self):
+        self.backend.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_get_user_inactive(self):
+        UserModel.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    @override_settings(AUTH_USER_CACHE_SECONDS=0)
+    def test_get_user_not_cached(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    async def test_aget_user_cached(self):
+        self.assertEqual(await self.backend.aget_user(self.user.pk), self.user)
+        self.assertIsNotNone(await cache.aget(get_user_cache_key(self.user.pk)))
+        self.assertEqual(await self.backend.aget_user(self.user.pk), self.user)
+
+
+class PermissionCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user(email="user@example.com")
+        cls.group = Group.objects.create(name="Editors")
+        cls.view_user = Permission.objects.get(codename="view_user")
+        cls.change_user = Permission.objects.get(codename="change_user")
+
+    def setUp(self):
+        clear_cached_permissions()
+
+    def has_perm(self, perm):
+        # A fresh instance, as on a new request
+        user = UserModel.objects.get(pk=self.user.pk)
+        return user.has_perm(perm)
+
+    def test_cached(self):
+        self.assertFalse(self.has_perm("accounts.view_user"))
+        with self.assertNumQueries(1):
+            self.assertFalse(self.has_perm("accounts.view_user"))
+
+    def test_user_permissions_changed(self):
+        self.assertFalse(self.has_perm("accounts.view_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(self.view_user)
+        self.assertTrue(self.has_perm("accounts.view_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.view_user.user_set.remove(self.user)
+        self.assertFalse(self.has_perm("accounts.view_user"))
+
+    def test_groups_changed(self):
+        self.group.permissions.add(self.view_user)
+        self.assertFalse(self.has_perm("accounts.view_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.group)
+        self.assertTrue(self.has_perm("accounts.view_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.clear()
+        self.assertFalse(self.has_perm("accounts.view_user"))
+
+    def test_group_permissions_changed(self):
+        self.user.groups.add(self.group)
+        self.assertFalse(self.has_perm("accounts.change_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.change_user)
+        self.assertTrue(self.has_perm("accounts.change_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.delete()
+        self.assertFalse(self.has_perm("accounts.change_user"))
+
+    def test_superuser_changed(self):
+        self.assertFalse(self.has_perm("accounts.view_user"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_superuser = True
+            self.user.save()
+        self.assertTrue(self.has_perm("accounts.view_user"))
+
+    @override_settings(AUTH_PERMISSION_CACHE_SECONDS=0)
+    def test_not_cached(self):
+        self.assertFalse(self.has_perm("accounts.view_user"))
+        with self.assertNumQueries(3):
+            self.assertFalse(self.has_perm("accounts.view_user"))
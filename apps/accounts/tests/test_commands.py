@@ -0,0 +1,163 @@
+import json
+import multiprocessing
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.accounts.management.commands import importusers
+from apps.accounts.managers import UserQuerySet
+
+
+UserModel = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportExportUsersTest(TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = Path(tmp_dir.name)
+
+    def import_users(self, name, content, **options):
+        path = self.tmp_dir / name
+        path.write_text(content)
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "importusers",
+            str(path),
+            processes=2,
+            batch_size=2,
+            stdout=stdout,
+            stderr=stderr,
+            **options,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        UserModel.objects.create_user(email="existing@example.com")
+        stdout, stderr = self.import_users(
+            "users.csv",
+            "email,password,first_name,is_staff\n"
+            "One@EXAMPLE.com,secret,One,true\n"
+            "two@example.com,,Two,false\n"
+            "One@example.COM,other,Duplicate,\n"
+            "existing@example.com,secret,,\n"
+            "invalid,secret,,\n",
+        )
+        self.assertEqual(
+            stdout,
+            "Created 2 user(s), skipped 2 existing user(s) and 1 invalid row(s).\n",
+        )
+        self.assertEqual(stderr, "Line 6: invalid email.\n")
+        one = UserModel.objects.get(email="One@example.com")
+        self.assertEqual(one.first_name, "One")
+        self.assertTrue(one.is_staff)
+        self.assertTrue(one.check_password("secret"))
+        two = UserModel.objects.get(email="two@example.com")
+        self.assertFalse(two.is_staff)
+        self.assertFalse(two.has_usable_password())
+
+    def test_import_invalid_fields(self):
+        stdout, stderr = self.import_users(
+            "users.csv",
+            "email,first_name,date_joined\n"
+            "one@example.com,One,2024-01-01 00:00+00:00\n"
+            "two@exa mple.com,Two,\n"
+            "three@example.com,Three,yesterday\n",
+        )
+        self.assertEqual(
+            stdout,
+            "Created 1 user(s), skipped 0 existing user(s) and 2 invalid row(s).\n",
+        )
+        self.assertEqual(
+            stderr.splitlines(),
+            [
+                "Line 3: email: Enter a valid email address.",
+                "Line 4: date_joined: \u201cyesterday\u201d value has an invalid "
+                "format. It must be in YYYY-MM-DD HH:MM[:ss[.uuuuuu]][TZ] format.",
+            ],
+        )
+        self.assertEqual(
+            list(UserModel.objects.values_list("email", flat=True)),
+            ["one@example.com"],
+        )
+
+    def test_import_jsonl(self):
+        stdout, stderr = self.import_users(
+            "users.jsonl",
+            '{"email": "one@example.com", "password": "secret", "is_active": false}\n'
+            "\n"
+            '{"email": "two@example.com", "password_hash": "unknown$hash"}\n',
+        )
+        self.assertEqual(stderr, "Line 3: unknown password hash.\n")
+        one = UserModel.objects.get(email="one@example.com")
+        self.assertFalse(one.is_active)
+        self.assertTrue(one.check_password("secret"))
+
+    def test_import_created_concurrently(self):
+        UserModel.objects.create_user(email="two@example.com")
+        get_existing_emails = importusers.Command.get_existing_emails
+        calls = []
+
+        def created_after_first_read(command, manager, emails):
+            calls.append(emails)
+            if len(calls) == 1:
+                return set()
+            return get_existing_emails(command, manager, emails)
+
+        with mock.patch.object(
+            importusers.Command, "get_existing_emails", created_after_first_read
+        ):
+            stdout, stderr = self.import_users(
+                "users.csv", "email\none@example.com\ntwo@example.com\n"
+            )
+        self.assertEqual(
+            stdout,
+            "Created 1 user(s), skipped 1 existing user(s) and 0 invalid row(s).\n",
+        )
+        self.assertEqual(UserModel.objects.count(), 2)
+
+    @mock.patch.object(
+        importusers.Command, "mp_context", multiprocessing.get_context("spawn")
+    )
+    def test_import_spawned_processes(self):
+        # Spawned processes don't inherit override_settings()
+        self.import_users("users.csv", "email,password\none@example.com,secret\n")
+        user = UserModel.objects.get()
+        self.assertEqual(user.password.split("$")[0], "md5")
+        self.assertTrue(user.check_password("secret"))
+
+    def test_export_import(self):
+        user = UserModel.objects.create_user(
+            email="one@example.com", password="secret", first_name="One"
+        )
+        for file_format in ["csv", "jsonl"]:
+            with self.subTest(file_format=file_format):
+                stdout = StringIO()
+                call_command(
+                    "exportusers",
+                    format=file_format,
+                    password_hashes=True,
+                    stdout=stdout,
+                )
+                UserModel.objects.all().delete()
+                self.import_users("users.%s" % file_format, stdout.getvalue())
+                imported = UserModel.objects.get()
+                self.assertEqual(imported.email, user.email)
+                self.assertEqual(imported.first_name, user.first_name)
+                self.assertEqual(imported.date_joined, user.date_joined)
+                self.assertTrue(imported.check_password("secret"))
+
+    def test_export_jsonl(self):
+        UserModel.objects.create_user(email="one@example.com", password="secret")
+        stdout = StringIO()
+        call_command("exportusers", format="jsonl", stdout=stdout)
+        row = json.loads(stdout.getvalue())
+        self.assertEqual(row["email"], "one@example.com")
+        self.assertNotIn("password_hash", row)
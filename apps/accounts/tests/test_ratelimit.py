@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts import ratelimit
+from apps.accounts.forms import AuthenticationForm
+from apps.accounts.models import LoginAttemptCount
+
+
+UserModel = get_user_model()
+
+
+@override_settings(LOGIN_RATE_LIMITS={"ip": (5, 60), "email": (3, 60)})
+class LoginRateLimitTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user(
+            email="user@example.com", password="password"
+        )
+
+    def setUp(self):
+        cache.clear()
+        ratelimit.local_cache.clear()
+        ratelimit.reset_counters()
+        self.factory = RequestFactory()
+
+    def test_email_limit(self):
+        request = self.factory.get("/")
+        for _ in range(3):
+            self.assertIsNone(authenticate(request, username="user@example.com"))
+        # The limit applies before the password is checked
+        with mock.patch.object(UserModel, "check_password") as check_password:
+            self.assertIsNone(
+                authenticate(request, username="USER@example.com", password="password")
+            )
+            check_password.assert_not_called()
+        other = self.factory.get("/", REMOTE_ADDR="10.0.0.1")
+        self.assertIsNone(
+            authenticate(other, username="user@EXAMPLE.com", password="password")
+        )
+        self.assertEqual(
+            ratelimit.get_counters(), {"attempts": 5, "limited": 2, "fallbacks": 0}
+        )
+
+    def test_ip_limit(self):
+        request = self.factory.get("/")
+        for i in range(5):
+            authenticate(request, username="user%s@example.com" % i, password="x")
+        self.assertIsNone(
+            authenticate(request, username="user@example.com", password="password")
+        )
+        other = self.factory.get("/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(
+            authenticate(other, username="user@example.com", password="password"),
+            self.user,
+        )
+
+    @override_settings(CLIENT_IP_HEADER="HTTP_FLY_CLIENT_IP")
+    def test_client_ip_header(self):
+        request = self.factory.get("/", HTTP_FLY_CLIENT_IP="10.0.0.1")
+        self.assertEqual(ratelimit.get_client_ip(request), "10.0.0.1")
+        request = self.factory.get("/")
+        self.assertEqual(ratelimit.get_client_ip(request), "127.0.0.1")
+
+    def test_cache_fallback(self):
+        request = self.factory.get("/")
+        with mock.patch.object(
+            ratelimit.cache, "incr", side_effect=ConnectionError
+        ), self.assertLogs("apps.accounts.ratelimit", "WARNING"):
+            for _ in range(3):
+                self.assertTrue(ratelimit.check_login_rate(request, "user@example.com"))
+            self.assertFalse(ratelimit.check_login_rate(request, "user@example.com"))
+        # Once per scope (IP address and email address) and attempt
+        self.assertEqual(
+            ratelimit.get_counters(), {"attempts": 4, "limited": 1, "fallbacks": 8}
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_database_counts(self):
+        self.assertIsInstance(ratelimit.get_counts(), ratelimit.DatabaseCounts)
+        request = self.factory.get("/")
+        for _ in range(3):
+            self.assertTrue(ratelimit.check_login_rate(request, "user@example.com"))
+        self.assertFalse(ratelimit.check_login_rate(request, "user@example.com"))
+        self.assertTrue(ratelimit.is_login_rate_limited(request, "user@example.com"))
+        # One count per scope, and none fell back to memory
+        self.assertEqual(
+            sorted(LoginAttemptCount.objects.values_list("count", flat=True)),
+            [4, 4],
+        )
+        self.assertEqual(ratelimit.get_counters()["fallbacks"], 0)
+        LoginAttemptCount.objects.update(expires_at=timezone.now())
+        self.assertEqual(ratelimit.DatabaseCounts.clear_expired(), 2)
+
+    def test_form(self):
+        request = self.factory.post("/")
+        data = {"username": "user@example.com", "password": "wrong"}
+        for _ in range(3):
+            form = AuthenticationForm(request, data=data)
+            self.assertEqual(
+                form.errors["__all__"][0][:28], "Please enter a correct email"
+            )
+        form = AuthenticationForm(request, data=data)
+        self.assertEqual(
+            form.errors["__all__"], ["Too many login attempts. Please try again later."]
+        )
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.accounts.search import get_search_terms
+
+
+UserModel = get_user_model()
+
+
+class UserSearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.john = UserModel.objects.create_user(
+            email="john@example.com", first_name="John", last_name="Smith"
+        )
+        cls.jane = UserModel.objects.create_user(
+            email="jane.doe@example.org", first_name="Jane", last_name="Doe"
+        )
+
+    def search(self, q):
+        return list(UserModel.objects.search(q))
+
+    def test_get_search_terms(self):
+        self.assertEqual(
+            get_search_terms("""john  'jane doe' "x" @ -"""),
+            ["john", "jane doe", "x"],
+        )
+
+    def test_search(self):
+        self.assertEqual(self.search("JOHN"), [self.john])
+        self.assertEqual(self.search("smi jo"), [self.john])
+        self.assertEqual(self.search("john@example.com"), [self.john])
+        self.assertEqual(self.search("jane.doe@EXAMPLE.org jane"), [self.jane])
+        self.assertEqual(self.search("jane@"), [])
+        self.assertEqual(self.search("example"), [self.john, self.jane])
+        self.assertEqual(self.search("example.org"), [self.jane])
+        self.assertEqual(self.search("'jane doe'"), [self.jane])
+        self.assertEqual(self.search('jane"'), [self.jane])
+        self.assertEqual(self.search("doe john"), [])
+        self.assertEqual(self.search("mith"), [])
+        self.assertEqual(self.search("@ -"), [])
+
+    def test_search_uuid(self):
+        self.assertEqual(self.search(" %s " % self.jane.uuid), [self.jane])
+
+    def test_search_ranked(self):
+        johnson = UserModel.objects.create_user(
+            email="other@example.com", last_name="Johnson"
+        )
+        results = UserModel.objects.search("john")
+        self.assertEqual(list(results), [self.john, johnson])
+        self.assertLess(results[0].search_rank, results[1].search_rank)
+
+    def test_index_kept_in_sync(self):
+        self.john.first_name = "Jonathan"
+        self.john.save()
+        self.assertEqual(self.search("jonathan"), [self.john])
+        self.assertEqual(self.search("smith john"), [self.john])
+        UserModel.objects.filter(pk=self.john.pk).update(email="jon@example.net")
+        self.assertEqual(self.search("example.net"), [self.john])
+        self.assertEqual(self.search("example.com"), [])
+        UserModel.objects.bulk_create([UserModel(email="bulk@example.com")])
+        self.assertEqual(self.search("bulk").__len__(), 1)
+        self.jane.delete()
+        self.assertEqual(self.search("jane"), [])
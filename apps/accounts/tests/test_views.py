@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+UserModel = get_user_model()
+
+
+class APIViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.john = UserModel.objects.create_user(
+            email="john@example.com", first_name="John", last_name="Smith"
+        )
+        cls.jane = UserModel.objects.create_user(
+            email="jane@example.com", first_name="Jane", last_name="Doe"
+        )
+        cls.staff = UserModel.objects.create_user(email="staff@example.com")
+        cls.staff.user_permissions.add(
+            Permission.objects.get(
+                codename="view_user", content_type__app_label="accounts"
+            )
+        )
+
+    def setUp(self):
+        # Users and permissions are cached across requests
+        cache.clear()
+
+    async def test_me(self):
+        url = reverse("accounts-api:me")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.john)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["uuid"], str(self.john.uuid))
+        self.assertEqual(response.json()["email"], "john@example.com")
+
+        response = await self.async_client.post(url)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_users(self):
+        url = reverse("accounts-api:users")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.john)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(url, {"q": "smith"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user["email"] for user in response.json()["results"]],
+            ["john@example.com"],
+        )
+        response = await self.async_client.get(url)
+        self.assertEqual(
+            [user["email"] for user in response.json()["results"]],
+            ["staff@example.com", "jane@example.com", "john@example.com"],
+        )
+
+
+class LoginViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user(
+            email="user@example.com", password="password"
+        )
+
+    def setUp(self):
+        # Also resets login rate limits
+        cache.clear()
+
+    @override_settings(LOGIN_RATE_LIMITS={"ip": (30, 60), "email": (2, 60)})
+    async def test_login(self):
+        url = reverse("accounts-api:login")
+        user = self.user
+        failed = []
+
+        def login_failed(**kwargs):
+            failed.append(kwargs)
+
+        user_login_failed.connect(login_failed)
+        self.addCleanup(user_login_failed.disconnect, login_failed)
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 405)
+        response = await self.async_client.post(url, {"email": "user@example.com"})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post(
+            url, {"email": "user@example.com", "password": "wrong"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0]["credentials"]["password"], "*" * 20)
+
+        response = await self.async_client.post(
+            url, {"email": "user@EXAMPLE.com", "password": "password"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["uuid"], str(user.uuid))
+        response = await self.async_client.get(reverse("accounts-api:me"))
+        self.assertEqual(response.json()["uuid"], str(user.uuid))
+
+        response = await self.async_client.post(
+            url, {"email": "user@example.com", "password": "password"}
+        )
+        self.assertEqual(response.status_code, 429)
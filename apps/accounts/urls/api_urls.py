@@ -4,4 +4,8 @@ from apps.accounts import views
 
 
 app_name = "accounts-api"
-urlpatterns = []
+urlpatterns = [
+    path("login/", views.login, name="login"),
+    path("me/", views.me, name="me"),
+    path("users/", views.users, name="users"),
+]
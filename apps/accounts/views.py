@@ -0,0 +1,80 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from .models import User
+from .ratelimit import is_login_rate_limited
+
+
+# Fields of a user exposed by the API
+USER_FIELDS = ("uuid", "email", "first_name", "last_name", "date_joined")
+
+# Maximum number of users returned by users()
+USERS_LIMIT = 20
+
+
+def serialize_user(user):
+    return {field: getattr(user, field) for field in USER_FIELDS}
+
+
+def error_response(message, status):
+    return JsonResponse({"detail": message}, status=status)
+
+
+@require_POST
+async def login(request):
+    """
+    Log in with the "email" and "password" form fields and return the user.
+    """
+    email = request.POST.get("email", "")
+    password = request.POST.get("password", "")
+    if not email or not password:
+        return error_response("Email and password are required.", 400)
+    # Runs authenticate() in this request's own thread, so the password is
+    # hashed outside the event loop (see apps.accounts.hashers).
+    user = await aauthenticate(request, username=email, password=password)
+    if user is None:
+        # The rate limit check uses the cache synchronously
+        if await sync_to_async(is_login_rate_limited)(
+            request, User.objects.normalize_email(email)
+        ):
+            return error_response(
+                "Too many login attempts. Please try again later.", 429
+            )
+        return error_response("Please enter a correct email and password.", 400)
+    await alogin(request, user)
+    return JsonResponse(serialize_user(user))
+
+
+@require_GET
+async def me(request):
+    """
+    Return the logged in user.
+    """
+    # request.user would query the database synchronously
+    user = await request.auser()
+    if not user.is_authenticated:
+        return error_response("Authentication credentials were not provided.", 401)
+    return JsonResponse(serialize_user(user))
+
+
+@require_GET
+async def users(request):
+    """
+    Return the users matching the "q" parameter, or the newest users if it's
+    missing. Requires the accounts.view_user permission.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return error_response("Authentication credentials were not provided.", 401)
+    # Permission checks may query the database
+    if not await sync_to_async(user.has_perm)("accounts.view_user"):
+        return error_response("You do not have permission to view users.", 403)
+
+    queryset = User.objects.only(*USER_FIELDS)
+    if q := request.GET.get("q", "").strip():
+        queryset = queryset.search(q)
+    # Async iteration fetches the rows without blocking the event loop
+    results = [serialize_user(user) async for user in queryset[:USERS_LIMIT]]
+    return JsonResponse({"results": results})
@@ -0,0 +1,219 @@
+import datetime
+import hashlib
+import uuid
+import weakref
+from decimal import Decimal
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Model
+from django.template import engines
+from django.template.base import (
+    FilterExpression,
+    Node,
+    Variable,
+    VariableDoesNotExist,
+)
+from django.template.context import make_context
+from django.template.defaulttags import CsrfTokenNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.template.smartif import TokenBase
+from django.utils.cache import patch_cache_control
+from django.utils.functional import Promise
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_page
+
+
+SITE_CACHE_ALIAS = "site"
+
+
+def cache_site_page(view):
+    """
+    Cache the page in the site cache for visitors without a session, i.e.
+    anonymous visitors. Visitors with a session get a freshly rendered page
+    that's marked as private, so user specific content never gets cached.
+
+    Unlike varying on the Cookie header, this keeps a single cached copy per
+    URL for everyone without a session. The cache lookups are sync, so wrap
+    sync views only: an async view would block the event loop on them.
+    """
+    cached_view = cache_page(settings.SITE_CACHE_SECONDS, cache=SITE_CACHE_ALIAS)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            response = view(request, *args, **kwargs)
+            patch_cache_control(response, private=True)
+            return response
+        return cached_view(request, *args, **kwargs)
+
+    return wrapper
+
+
+# Template -> variables its output depends on, see get_fragment_variables()
+_fragment_variables = weakref.WeakKeyDictionary()
+
+
+def _find_variables(obj, variables):
+    if isinstance(obj, Variable):
+        if obj.lookups is not None:
+            variables[obj.var] = obj
+    elif isinstance(obj, FilterExpression):
+        _find_variables(obj.var, variables)
+        for func, args in obj.filters:
+            for lookup, arg in args:
+                _find_variables(arg, variables)
+    elif isinstance(obj, TokenBase):
+        # A condition of an if tag
+        for attr in ("value", "first", "second"):
+            _find_variables(getattr(obj, attr, None), variables)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _find_variables(item, variables)
+    elif isinstance(obj, dict):
+        for item in obj.values():
+            _find_variables(item, variables)
+
+
+def _find_template_variables(template, variables, seen):
+    seen.add(template.name)
+    for node in template.nodelist.get_nodes_by_type(Node):
+        if isinstance(node, CsrfTokenNode):
+            return False
+        if isinstance(node, (ExtendsNode, IncludeNode)):
+            name = node.parent_name if isinstance(node, ExtendsNode) else node.template
+            if not isinstance(name, FilterExpression) or isinstance(name.var, Variable):
+                # A template picked at render time
+                return False
+            if name.var not in seen:
+                included = template.engine.get_template(name.var)
+                if not _find_template_variables(included, variables, seen):
+                    return False
+        for attr, value in vars(node).items():
+            if attr not in ("token", "origin"):
+                _find_variables(value, variables)
+    return True
+
+
+def get_fragment_variables(template):
+    """
+    Return a dict of the variables used by the template and the templates it
+    includes, e.g. "request.get_host", mapped to Variable instances. Return
+    None if the output can't be cached, e.g. because it has a CSRF token.
+    """
+    try:
+        return _fragment_variables[template]
+    except KeyError:
+        pass
+    variables = {}
+    if not _find_template_variables(template, variables, set()):
+        variables = None
+    _fragment_variables[template] = variables
+    return variables
+
+
+def get_fragment_version_key(template_name):
+    return "fragment-version:%s" % hashlib.sha256(template_name.encode()).hexdigest()
+
+
+def get_fragment_value(name, value):
+    """
+    Return a stable representation of a variable's value for a fragment's
+    cache key. Model instances are represented by their pk and modified_at,
+    if they have one. Raise TypeError for other objects, e.g. querysets, which
+    would have to be evaluated to tell if the output changed.
+    """
+    if value is None or isinstance(
+        value, (str, int, float, Decimal, datetime.date, datetime.time, uuid.UUID)
+    ):
+        return value
+    if isinstance(value, Promise):
+        return str(value)
+    if isinstance(value, Model) and value.pk is not None:
+        return (value._meta.label, value.pk, getattr(value, "modified_at", None))
+    raise TypeError(
+        "Can't cache a fragment that depends on %r, a %s."
+        % (name, type(value).__name__)
+    )
+
+
+def get_fragment_key(template, variables, context, version):
+    """
+    Return the cache key of the template's output, derived from the values of
+    its variables in the context and the template's version, see
+    clear_fragment_cache().
+    """
+    values = []
+    for name, variable in sorted(variables.items()):
+        try:
+            value = variable.resolve(context)
+        except VariableDoesNotExist:
+            value = None
+        values.append((name, get_fragment_value(name, value)))
+    key = repr((template.name, version, values))
+    return "fragment:%s" % hashlib.sha256(key.encode()).hexdigest()
+
+
+def render_cached_fragment(template, context):
+    """
+    Render a compiled template in the context, reusing the output of a
+    previous render with the same variable values. Output that depends on
+    anything besides the variables, e.g. the now tag, is cached as is. The
+    variables must have stable values, see get_fragment_value().
+
+    Reading the cache costs about as much as rendering a small template, so
+    only cache templates that are expensive to render, e.g. that include
+    several other templates.
+    """
+    variables = get_fragment_variables(template)
+    if variables is None:
+        return template.render(context)
+    cache = caches[SITE_CACHE_ALIAS]
+    # A random version rather than a counter, so that a version that got
+    # evicted doesn't bring back the output cached before it was bumped
+    version = cache.get_or_set(
+        get_fragment_version_key(template.name), lambda: uuid.uuid4().hex, None
+    )
+    key = get_fragment_key(template, variables, context, version)
+    content = cache.get(key)
+    if content is None:
+        content = template.render(context)
+        cache.set(key, content, settings.SITE_CACHE_SECONDS)
+    return mark_safe(content)
+
+
+def render_fragment(template_name, context=None, request=None):
+    """
+    Render a template through the fragment cache, e.g. to pass the output to
+    another template as a context variable.
+    """
+    backend = engines["django"]
+    template = backend.get_template(template_name).template
+    context = make_context(context, request, autoescape=backend.engine.autoescape)
+    with context.bind_template(template):
+        return render_cached_fragment(template, context)
+
+
+def clear_fragment_cache(*template_names, **kwargs):
+    """
+    Invalidate the cached output of the templates, e.g.
+    clear_fragment_cache("site/components/faq.html"). Pages in the site cache
+    keep the old output until they expire.
+
+    Without template names, every cached fragment is invalidated by clearing
+    the site cache, cached pages included. Accepts any keyword arguments so
+    that it can be connected to signals, e.g. post_save of a model shown in a
+    fragment, with functools.partial() to pass the template names.
+    """
+    cache = caches[SITE_CACHE_ALIAS]
+    if not template_names:
+        cache.clear()
+        return
+    cache.set_many(
+        {
+            get_fragment_version_key(template_name): uuid.uuid4().hex
+            for template_name in template_names
+        },
+        None,
+    )
@@ -0,0 +1,32 @@
+from django import template
+from django.template.loader_tags import IncludeNode
+
+from apps.site.cache import render_cached_fragment
+
+
+register = template.Library()
+
+
+class IncludeCachedNode(IncludeNode):
+
+    def render(self, context):
+        template_name = self.template.resolve(context)
+        fragment = context.template.engine.get_template(template_name)
+        return render_cached_fragment(fragment, context)
+
+
+@register.tag
+def include_cached(parser, token):
+    """
+    Like the include tag, but the included template's output is cached in the
+    site cache. The cache key is derived from the values of the variables the
+    included template uses. Only worth it for templates that are expensive to
+    render, see render_cached_fragment().
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            "%r tag takes one argument: the name of the template to be included."
+            % bits[0]
+        )
+    return IncludeCachedNode(parser.compile_filter(bits[1]))
@@ -0,0 +1,122 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.template import Context, Engine, engines
+from django.test import RequestFactory, SimpleTestCase
+
+from apps.site.cache import (
+    SITE_CACHE_ALIAS,
+    clear_fragment_cache,
+    get_fragment_value,
+    get_fragment_variables,
+    render_fragment,
+)
+
+
+META_VARIABLES = {
+    "meta_title",
+    "meta_description",
+    "meta_image",
+    "request.scheme",
+    "request.get_host",
+}
+
+
+class FragmentCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        caches[SITE_CACHE_ALIAS].clear()
+        self.addCleanup(caches[SITE_CACHE_ALIAS].clear)
+        self.request = RequestFactory().get("/")
+        self.engine = Engine(
+            dirs=[Path(__file__).resolve().parent / "templates"],
+            app_dirs=True,
+            libraries={"site_cache": "apps.site.templatetags.site_cache"},
+        )
+
+    def replace_template(self, template_name):
+        # Change a cached template's output without changing its variables
+        template = engines["django"].get_template(template_name).template
+        self.addCleanup(setattr, template, "nodelist", template.nodelist)
+        template.nodelist = self.engine.get_template("fragments/changed.html").nodelist
+
+    def test_get_fragment_variables(self):
+        template = engines["django"].get_template("site/partials/meta.html")
+        self.assertEqual(set(get_fragment_variables(template.template)), META_VARIABLES)
+        template = self.engine.get_template("fragments/variables.html")
+        self.assertEqual(
+            set(get_fragment_variables(template)),
+            {"user.is_staff", "items", "item", "fallback"} | META_VARIABLES,
+        )
+        template = self.engine.get_template("fragments/include_cached.html")
+        self.assertEqual(set(get_fragment_variables(template)), META_VARIABLES)
+
+    def test_get_fragment_variables_uncacheable(self):
+        for template_name in [
+            "fragments/csrf_token.html",
+            "fragments/include_variable.html",
+        ]:
+            with self.subTest(template_name=template_name):
+                template = self.engine.get_template(template_name)
+                self.assertIsNone(get_fragment_variables(template))
+
+    def test_render_fragment(self):
+        template_name = "site/partials/meta.html"
+        content = render_fragment(template_name, {"meta_title": "A"}, self.request)
+        self.assertIn('content="A"', content)
+        content = render_fragment(template_name, {"meta_title": "B"}, self.request)
+        self.assertIn('content="B"', content)
+        self.replace_template(template_name)
+        content = render_fragment(template_name, {"meta_title": "A"}, self.request)
+        self.assertIn('content="A"', content)
+        content = render_fragment(template_name, {"meta_title": "C"}, self.request)
+        self.assertEqual(content, "changed\n")
+        clear_fragment_cache()
+        content = render_fragment(template_name, {"meta_title": "A"}, self.request)
+        self.assertEqual(content, "changed\n")
+
+    def test_clear_fragment_cache(self):
+        template_name = "site/components/faq.html"
+        render_fragment(template_name)
+        self.replace_template(template_name)
+        self.assertNotEqual(render_fragment(template_name), "changed\n")
+        clear_fragment_cache()
+        self.assertEqual(render_fragment(template_name), "changed\n")
+
+    def test_clear_fragment_cache_template(self):
+        meta, faq = "site/partials/meta.html", "site/components/faq.html"
+        render_fragment(meta, request=self.request)
+        render_fragment(faq)
+        self.replace_template(meta)
+        self.replace_template(faq)
+        clear_fragment_cache(faq)
+        self.assertEqual(render_fragment(faq), "changed\n")
+        self.assertNotEqual(render_fragment(meta, request=self.request), "changed\n")
+        # Even if the version was evicted
+        caches[SITE_CACHE_ALIAS].clear()
+        self.assertEqual(render_fragment(meta, request=self.request), "changed\n")
+
+    def test_get_fragment_value(self):
+        self.assertEqual(get_fragment_value("title", "A"), "A")
+        self.assertIsNone(get_fragment_value("title", None))
+        user = get_user_model()(pk=1)
+        self.assertEqual(
+            get_fragment_value("user", user),
+            (user._meta.label, 1, None),
+        )
+        for value in [get_user_model().objects.all(), [1], get_user_model()()]:
+            with self.subTest(value=value), self.assertRaises(TypeError):
+                get_fragment_value("value", value)
+
+    def test_include_cached(self):
+        request = RequestFactory().get("/", HTTP_HOST="example.com")
+        template = self.engine.get_template("fragments/include_cached.html")
+        context = Context({"request": request})
+        self.assertIn('content="http://example.com"', template.render(context))
+        fragment = self.engine.get_template("site/partials/meta.html")
+        self.addCleanup(setattr, fragment, "nodelist", fragment.nodelist)
+        fragment.nodelist = self.engine.get_template("fragments/changed.html").nodelist
+        self.assertIn('content="http://example.com"', template.render(context))
+        clear_fragment_cache()
+        self.assertEqual(template.render(context), "\nchanged\n\n")
@@ -0,0 +1,59 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.site.cache import SITE_CACHE_ALIAS
+
+
+class HomeViewTest(TestCase):
+
+    def setUp(self):
+        caches[SITE_CACHE_ALIAS].clear()
+        self.addCleanup(caches[SITE_CACHE_ALIAS].clear)
+
+    def test_cached(self):
+        response = self.client.get(reverse("site:home"))
+        self.assertTemplateUsed(response, "site/home.html")
+        self.assertIn(
+            "max-age=%s" % settings.SITE_CACHE_SECONDS, response["Cache-Control"]
+        )
+        response = self.client.get(reverse("site:home"))
+        self.assertTemplateNotUsed(response, "site/home.html")
+        self.assertEqual(response.status_code, 200)
+
+    def test_clearcache(self):
+        self.client.get(reverse("site:home"))
+        call_command("clearcache", SITE_CACHE_ALIAS, verbosity=0)
+        response = self.client.get(reverse("site:home"))
+        self.assertTemplateUsed(response, "site/home.html")
+
+    def test_not_cached_with_session(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "session"
+        for _ in range(2):
+            response = self.client.get(reverse("site:home"))
+            self.assertTemplateUsed(response, "site/home.html")
+            self.assertIn("private", response["Cache-Control"])
+
+    def test_session_not_loaded(self):
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session["key"] = "value"
+        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("site:home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.wsgi_request.session.accessed)
+
+    async def test_async_client(self):
+        # The view stays sync, run in a thread under ASGI
+        response = await self.async_client.get(reverse("site:home"))
+        self.assertTemplateUsed(response, "site/home.html")
+        response = await self.async_client.get(reverse("site:home"))
+        self.assertTemplateNotUsed(response, "site/home.html")
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = "session"
+        response = await self.async_client.get(reverse("site:home"))
+        self.assertIn("private", response["Cache-Control"])
@@ -1,5 +1,8 @@
 from django.shortcuts import render
 
+from .cache import cache_site_page
 
+
+@cache_site_page
 def home(request):
     return render(request, "site/home.html")
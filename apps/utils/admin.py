@@ -0,0 +1,66 @@
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """
+    Return the number of rows in the queryset's table according to the
+    database's statistics, or None if the database doesn't keep any.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # -1 if the table was never analyzed
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that stops counting at max_count rows, so later pages can't
+    be reached. Unfiltered tables that the database keeps statistics for are
+    estimated instead, so all their pages can.
+    """
+
+    max_count = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= self.max_count:
+                return estimate
+        return queryset[: self.max_count].count()
+
+
+class PerformanceModeChangeList(ChangeList):
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        # Only load the listed columns
+        field_names = {field.name for field in self.opts.concrete_fields}
+        fields = [name for name in self.list_display if name in field_names]
+        return queryset.only(*fields) if fields else queryset
+
+
+class PerformanceModeAdminMixin:
+    """
+    Changelist settings for tables with millions of rows: counts are capped
+    or estimated, the unfiltered total isn't counted and only the listed
+    columns are loaded. Combine with search_fields that use indexes, e.g.
+    exact ("=") or prefix ("^") matches.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return PerformanceModeChangeList
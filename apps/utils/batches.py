@@ -0,0 +1,96 @@
+import atexit
+import os
+import threading
+from collections import namedtuple
+
+from celery import Task
+from celery.signals import worker_process_shutdown
+
+
+BatchCall = namedtuple("BatchCall", ["args", "kwargs"])
+
+
+class BatchTask(Task):
+    """
+    A task for many small units of work, e.g. one per user. Calls to buffer()
+    are collected in the calling process and sent as a single message, and
+    the task runs once per batch with a list of BatchCall. Process a batch
+    with bulk queries, e.g.:
+
+        @shared_task(base=BatchTask, flush_every=500)
+        def recompute_scores(calls):
+            users = User.objects.in_bulk([call.args[0] for call in calls])
+            for user in users.values():
+                user.score = ...
+            User.objects.bulk_update(users.values(), ["score"])
+
+        recompute_scores.buffer(user.pk)
+
+    A batch is sent once it has flush_every calls, flush_interval seconds
+    after its first call, on flush(), or when the process exits. Buffered
+    calls are lost if the process is killed, so buffer from on_commit()
+    callbacks and keep batches safe to run more than once. Forked processes
+    start with an empty batch, leaving the buffered calls to their parent.
+    """
+
+    flush_every = 100
+    flush_interval = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._reset_batch()
+        # A forked child would inherit a timer whose thread doesn't exist in
+        # it, so its batch would never be sent by flush_interval.
+        os.register_at_fork(after_in_child=self._reset_batch)
+        atexit.register(self.flush)
+        worker_process_shutdown.connect(self._flush_on_shutdown, weak=False)
+
+    def __call__(self, calls):
+        calls = [BatchCall(tuple(args), kwargs) for args, kwargs in calls]
+        request = self.request_stack.top
+        if request is not None and not request.called_directly:
+            # Run by a worker or apply(), which already pushed the request.
+            # Pushing another one would make retry() think the task was
+            # called directly, like Celery's stack protection prevents.
+            return self.run(calls)
+        return super().__call__(calls)
+
+    def buffer(self, *args, **kwargs):
+        """
+        Add a call to the current batch, sending the batch if it's full.
+        """
+        with self._batch_lock:
+            self._batch_calls.append((args, kwargs))
+            if len(self._batch_calls) < self.flush_every:
+                if self._batch_timer is None:
+                    self._batch_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._batch_timer.daemon = True
+                    self._batch_timer.start()
+                return None
+            calls = self._take_calls()
+        return self.apply_async((calls,))
+
+    def flush(self):
+        """
+        Send the current batch, if any. Return its AsyncResult.
+        """
+        with self._batch_lock:
+            calls = self._take_calls()
+        if calls:
+            return self.apply_async((calls,))
+
+    def _reset_batch(self):
+        self._batch_calls = []
+        self._batch_lock = threading.Lock()
+        self._batch_timer = None
+
+    def _take_calls(self):
+        calls, self._batch_calls = self._batch_calls, []
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        return calls
+
+    def _flush_on_shutdown(self, **kwargs):
+        # Prefork worker processes exit without running atexit handlers
+        self.flush()
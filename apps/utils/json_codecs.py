@@ -0,0 +1,190 @@
+"""
+Pluggable JSON encoders/decoders used by the JSON fields in apps.utils.models.
+
+Set JSON_CODEC to the dotted path of a codec class to pick one explicitly.
+Otherwise the fastest installed codec is used: orjson, then msgspec, then the
+standard library.
+
+Large values can also be stored compressed (see compress_json()).
+"""
+
+import base64
+import functools
+import json
+import zlib
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+class StdlibJSONCodec:
+    """
+    Codecs expose loads() and dumps(). loads() must raise a ValueError for
+    invalid JSON, and dumps() a TypeError for values that can't be encoded.
+    """
+
+    def loads(self, value):
+        return json.loads(value)
+
+    def dumps(self, value):
+        return json.dumps(value)
+
+
+class OrjsonJSONCodec:
+
+    def __init__(self):
+        import orjson
+
+        self.orjson = orjson
+
+    def loads(self, value):
+        # orjson.JSONDecodeError is a subclass of ValueError
+        return self.orjson.loads(value)
+
+    def dumps(self, value):
+        # orjson.JSONEncodeError is a subclass of TypeError
+        return self.orjson.dumps(value, option=self.orjson.OPT_NON_STR_KEYS).decode()
+
+
+class MsgspecJSONCodec:
+
+    def __init__(self):
+        import msgspec
+
+        self.msgspec = msgspec
+        self.encoder = msgspec.json.Encoder()
+        self.decoder = msgspec.json.Decoder()
+
+    def loads(self, value):
+        try:
+            return self.decoder.decode(value)
+        except self.msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(self, value):
+        try:
+            return self.encoder.encode(value).decode()
+        except self.msgspec.EncodeError as e:
+            raise TypeError(str(e)) from e
+
+
+DEFAULT_JSON_CODECS = [OrjsonJSONCodec, MsgspecJSONCodec, StdlibJSONCodec]
+
+
+@functools.cache
+def get_json_codec():
+    """
+    Return the codec selected by the JSON_CODEC setting, or the first
+    installed one in DEFAULT_JSON_CODECS.
+    """
+    codec_path = getattr(settings, "JSON_CODEC", None)
+    if codec_path:
+        return import_string(codec_path)()
+    for codec_class in DEFAULT_JSON_CODECS:
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+
+
+@receiver(setting_changed)
+def clear_json_codec(*, setting, **kwargs):
+    if setting == "JSON_CODEC":
+        get_json_codec.cache_clear()
+
+
+class CodecJSONEncoder(json.JSONEncoder):
+    """
+    A JSONEncoder that hands off to the configured codec, so it can be used
+    anywhere Django expects an encoder class.
+    """
+
+    def encode(self, o):
+        if self.sort_keys or self.indent is not None or not self.ensure_ascii:
+            # Formatting options only the standard library supports, e.g.
+            # forms' ensure_ascii=False, so non-ASCII text is shown as is.
+            return super().encode(o)
+        return get_json_codec().dumps(o)
+
+
+class ZlibCompression:
+    """
+    Compressions expose compress() and decompress(). decompress() must raise
+    a ValueError for invalid data.
+    """
+
+    header = "zlib:1:"
+
+    def compress(self, data):
+        return zlib.compress(data)
+
+    def decompress(self, data):
+        try:
+            return zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(str(e)) from e
+
+
+class ZstdCompression:
+    header = "zstd:1:"
+
+    def __init__(self):
+        import zstandard
+
+        self.zstandard = zstandard
+
+    def compress(self, data):
+        return self.zstandard.compress(data)
+
+    def decompress(self, data):
+        try:
+            return self.zstandard.decompress(data)
+        except self.zstandard.ZstdError as e:
+            raise ValueError(str(e)) from e
+
+
+COMPRESSIONS = {
+    "zlib": ZlibCompression,
+    "zstd": ZstdCompression,
+}
+
+# Smaller payloads are stored as plain JSON
+COMPRESSION_MIN_SIZE = 512
+
+
+@functools.cache
+def get_compression(name):
+    return COMPRESSIONS[name]()
+
+
+def compress_json(text, compression):
+    """
+    Compress JSON text into a versioned envelope, e.g. "zlib:1:<base64>".
+    The envelope is itself a JSON string, so it can be stored in any JSON
+    column. Return None if the text is too small to be worth compressing.
+    """
+    data = text.encode()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return None
+    compression = get_compression(compression)
+    return compression.header + base64.b64encode(compression.compress(data)).decode()
+
+
+def decompress_json(raw):
+    """
+    Return the JSON text stored in raw if it's a JSON encoded envelope made
+    by compress_json(), or raw unchanged otherwise. Raise a ValueError if the
+    envelope is invalid.
+    """
+    if not isinstance(raw, str) or not raw.startswith('"'):
+        return raw
+    for name, compression_class in COMPRESSIONS.items():
+        if raw.startswith(compression_class.header, 1):
+            compression = get_compression(name)
+            data = base64.b64decode(
+                raw[len(compression.header) + 1 : -1], validate=True
+            )
+            return compression.decompress(data).decode()
+    return raw
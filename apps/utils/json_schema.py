@@ -0,0 +1,290 @@
+"""
+Compile JSON Schemas into plain Python validator callables.
+
+Only a subset of JSON Schema is supported: type, enum, const, properties,
+required, additionalProperties, items, minItems, maxItems, uniqueItems,
+minLength, maxLength, pattern, minimum, maximum, exclusiveMinimum and
+exclusiveMaximum. Compiling a schema that uses any other keyword or type
+raises ImproperlyConfigured.
+"""
+
+import functools
+import json
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class SchemaValidationError(ValueError):
+
+    def __init__(self, message, path=None):
+        super().__init__(message)
+        self.message = message
+        self.path = path or []
+
+    def __str__(self):
+        if self.path:
+            return "%s: %s" % ("/".join(str(key) for key in self.path), self.message)
+        return self.message
+
+
+TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    # As in JSON Schema, numbers with a zero fractional part, e.g. 1.0
+    "integer": lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool))
+        or (isinstance(value, float) and value.is_integer())
+    ),
+    "number": lambda value: (
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+    ),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+ANNOTATIONS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "default",
+    "examples",
+}
+
+
+def is_array(value):
+    return isinstance(value, list)
+
+
+def is_string(value):
+    return isinstance(value, str)
+
+
+def is_number(value):
+    return TYPES["number"](value)
+
+
+def json_equal(a, b):
+    """
+    Compare JSON values the way JSON Schema does, where e.g. true isn't equal
+    to 1 even though True == 1 in Python.
+    """
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(map(json_equal, a, b))
+    return a == b
+
+
+def compile_type(arg, schema):
+    types = [arg] if isinstance(arg, str) else list(arg)
+    for type_ in types:
+        if type_ not in TYPES:
+            raise ImproperlyConfigured("Unsupported JSON Schema type: %r" % type_)
+    tests = tuple(TYPES[type_] for type_ in types)
+    message = "Expected %s." % " or ".join(types)
+
+    def check(value):
+        if not any(test(value) for test in tests):
+            raise SchemaValidationError(message)
+
+    return check
+
+
+def compile_enum(arg, schema):
+    message = "Expected one of %s." % ", ".join(json.dumps(item) for item in arg)
+
+    def check(value):
+        if not any(json_equal(value, item) for item in arg):
+            raise SchemaValidationError(message)
+
+    return check
+
+
+def compile_const(arg, schema):
+    return compile_enum([arg], schema)
+
+
+def compile_properties(arg, schema):
+    validators = {key: compile_schema(subschema) for key, subschema in arg.items()}
+
+    def check(value):
+        if not isinstance(value, dict):
+            return
+        for key, validate in validators.items():
+            if key in value:
+                try:
+                    validate(value[key])
+                except SchemaValidationError as e:
+                    e.path.insert(0, key)
+                    raise
+
+    return check
+
+
+def compile_required(arg, schema):
+    def check(value):
+        if not isinstance(value, dict):
+            return
+        for key in arg:
+            if key not in value:
+                raise SchemaValidationError("Missing required property %r." % key)
+
+    return check
+
+
+def compile_additional_properties(arg, schema):
+    known_keys = frozenset(schema.get("properties", ()))
+    validate = None if isinstance(arg, bool) else compile_schema(arg)
+
+    def check(value):
+        if not isinstance(value, dict):
+            return
+        for key in value.keys() - known_keys:
+            if validate is None:
+                if not arg:
+                    raise SchemaValidationError("Unexpected property %r." % key)
+                continue
+            try:
+                validate(value[key])
+            except SchemaValidationError as e:
+                e.path.insert(0, key)
+                raise
+
+    return check
+
+
+def compile_items(arg, schema):
+    validate = compile_schema(arg)
+
+    def check(value):
+        if not isinstance(value, list):
+            return
+        for index, item in enumerate(value):
+            try:
+                validate(item)
+            except SchemaValidationError as e:
+                e.path.insert(0, index)
+                raise
+
+    return check
+
+
+def compile_unique_items(arg, schema):
+    def check(value):
+        if not arg or not isinstance(value, list):
+            return
+        seen = set()
+        for item in value:
+            key = json.dumps(item, sort_keys=True)
+            if key in seen:
+                raise SchemaValidationError("Expected unique items.")
+            seen.add(key)
+
+    return check
+
+
+def compile_bound(test, applies, message):
+    def compiler(arg, schema):
+        def check(value):
+            if applies(value) and not test(value, arg):
+                raise SchemaValidationError(message % arg)
+
+        return check
+
+    return compiler
+
+
+def compile_pattern(arg, schema):
+    regex = re.compile(arg)
+
+    def check(value):
+        if isinstance(value, str) and not regex.search(value):
+            raise SchemaValidationError("Expected to match %r." % arg)
+
+    return check
+
+
+KEYWORDS = {
+    "type": compile_type,
+    "enum": compile_enum,
+    "const": compile_const,
+    "properties": compile_properties,
+    "required": compile_required,
+    "additionalProperties": compile_additional_properties,
+    "items": compile_items,
+    "uniqueItems": compile_unique_items,
+    "minItems": compile_bound(
+        lambda value, arg: len(value) >= arg, is_array, "Expected at least %s items."
+    ),
+    "maxItems": compile_bound(
+        lambda value, arg: len(value) <= arg, is_array, "Expected at most %s items."
+    ),
+    "minLength": compile_bound(
+        lambda value, arg: len(value) >= arg,
+        is_string,
+        "Expected at least %s characters.",
+    ),
+    "maxLength": compile_bound(
+        lambda value, arg: len(value) <= arg,
+        is_string,
+        "Expected at most %s characters.",
+    ),
+    "pattern": compile_pattern,
+    "minimum": compile_bound(
+        lambda value, arg: value >= arg, is_number, "Expected a minimum of %s."
+    ),
+    "maximum": compile_bound(
+        lambda value, arg: value <= arg, is_number, "Expected a maximum of %s."
+    ),
+    "exclusiveMinimum": compile_bound(
+        lambda value, arg: value > arg, is_number, "Expected more than %s."
+    ),
+    "exclusiveMaximum": compile_bound(
+        lambda value, arg: value < arg, is_number, "Expected less than %s."
+    ),
+}
+
+
+def compile_schema(schema):
+    """
+    Compile a JSON Schema into a callable that raises a SchemaValidationError
+    for invalid values.
+    """
+    checks = []
+    for keyword, arg in schema.items():
+        if keyword in ANNOTATIONS:
+            continue
+        try:
+            compiler = KEYWORDS[keyword]
+        except KeyError:
+            raise ImproperlyConfigured("Unsupported JSON Schema keyword: %r" % keyword)
+        checks.append(compiler(arg, schema))
+    checks = tuple(checks)
+
+    def validate(value):
+        for check in checks:
+            check(value)
+
+    return validate
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_validator(schema_json):
+    return compile_schema(json.loads(schema_json))
+
+
+def get_schema_validator(schema):
+    """
+    Return a validator for the given schema. Callables are assumed to be
+    validators already, e.g. from fastjsonschema.compile(). Compiled schemas
+    are cached, so fields sharing a schema share a validator.
+    """
+    if schema is None or callable(schema):
+        return schema
+    return _get_schema_validator(json.dumps(schema, sort_keys=True))
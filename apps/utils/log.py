@@ -0,0 +1,202 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.utils import log
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Pass records to slow handlers, e.g. AdminEmailHandler, on a background
+    thread. Configure the handlers in LOGGING, e.g.:
+
+        "queue": {
+            "level": "ERROR",
+            "class": "apps.utils.log.QueueHandler",
+            "handlers": ["mail_admins"],
+            "queue": {"()": "queue.Queue", "maxsize": 1000},
+            "respect_handler_level": True,
+        }
+
+    Records are dropped instead of blocking the logging thread while the
+    queue is full, so give the handler a level that keeps the queue for the
+    records that need it. The listener thread starts with the first record of
+    each process, so it also runs in workers forked after logging was
+    configured, e.g. by gunicorn --preload.
+    """
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        # Set by dictConfig()
+        self.listener = None
+        self.listener_pid = None
+
+    def prepare(self, record):
+        # Unlike the base class, don't merge the traceback into the message.
+        # Handlers with a render() method, e.g. AdminEmailHandler, render
+        # what they need from the record now, so that the queued record
+        # doesn't keep the traceback's frames or Django's record.request
+        # alive, and isn't evaluated on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        for handler in self.listener.handlers if self.listener else ():
+            if hasattr(handler, "render") and record.levelno >= handler.level:
+                handler.render(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.__dict__.pop("request", None)
+        return record
+
+    def enqueue(self, record):
+        self.start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def start_listener(self):
+        # Called with the handler's lock held
+        if self.listener is None or self.listener_pid == os.getpid():
+            return
+        if self.listener_pid is not None:
+            # Forked: the parent's listener thread doesn't run here, and its
+            # queue's locks may have been held when the process forked.
+            self.queue = type(self.queue)(self.queue.maxsize)
+        else:
+            atexit.register(self.stop_listener)
+        self.listener = type(self.listener)(
+            self.queue,
+            *self.listener.handlers,
+            respect_handler_level=self.listener.respect_handler_level,
+        )
+        self.listener.start()
+        self.listener_pid = os.getpid()
+
+    def stop_listener(self):
+        """
+        Handle the queued records and stop the listener thread.
+        """
+        if self.listener_pid != os.getpid():
+            return
+        try:
+            self.listener.stop()
+        except queue.Full:
+            pass
+        self.listener_pid = None
+
+
+class AdminEmailHandler(log.AdminEmailHandler):
+    """
+    Django's AdminEmailHandler, for use behind QueueHandler: the email is
+    rendered on the logging thread by render() and only sent on the listener
+    thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rendering = threading.local()
+
+    def render(self, record):
+        """
+        Render the record's email like emit() would, as record.admin_email.
+        """
+        record.admin_email = None
+        if not settings.ADMINS:
+            return
+        self._rendering.emails = emails = []
+        try:
+            super().emit(record)
+        finally:
+            del self._rendering.emails
+        if emails:
+            record.admin_email = emails[0]
+
+    def emit(self, record):
+        if not hasattr(record, "admin_email"):
+            return super().emit(record)
+        if record.admin_email is not None:
+            args, kwargs = record.admin_email
+            self.send_mail(*args, **kwargs)
+
+    def send_mail(self, *args, **kwargs):
+        emails = getattr(self._rendering, "emails", None)
+        if emails is not None:
+            emails.append((args, kwargs))
+        else:
+            super().send_mail(*args, **kwargs)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through up to `rate` records of each kind, and `total_rate` records
+    overall, per `period` seconds. Records are of the same kind if they were
+    logged at the same place, or if they're for the same exception type
+    raised at the same place.
+
+    The first record let through after others of its kind were filtered out
+    says how many were.
+    """
+
+    def __init__(self, rate=1, total_rate=10, period=60 * 5):
+        super().__init__()
+        self.rate = rate
+        self.total_rate = total_rate
+        self.period = period
+        self.lock = threading.Lock()
+        # Record key -> [period start, count, suppressed count]
+        self.counts = {}
+        self.total = [0, 0]
+
+    def now(self):
+        return time.monotonic()
+
+    def get_key(self, record):
+        if record.exc_info and record.exc_info[1] is not None:
+            exc_type, exc, tb = record.exc_info
+            while tb is not None and tb.tb_next is not None:
+                tb = tb.tb_next
+            if tb is not None:
+                code = tb.tb_frame.f_code
+                return (exc_type, code.co_filename, tb.tb_lineno)
+            return (exc_type, record.pathname, record.lineno)
+        return (record.name, record.levelno, record.pathname, record.lineno)
+
+    def filter(self, record):
+        now = self.now()
+        key = self.get_key(record)
+        with self.lock:
+            if now - self.total[0] >= self.period:
+                self.total[:] = [now, 0]
+            counts = self.counts.get(key)
+            if counts is None or now - counts[0] >= self.period:
+                suppressed = counts[2] if counts else 0
+                counts = self.counts[key] = [now, 0, suppressed]
+            if counts[1] >= self.rate or self.total[1] >= self.total_rate:
+                counts[2] += 1
+                return False
+            counts[1] += 1
+            self.total[1] += 1
+            suppressed, counts[2] = counts[2], 0
+            # Forget kinds that haven't been seen for a period
+            if len(self.counts) > 1000:
+                self.counts = {
+                    k: v for k, v in self.counts.items() if now - v[0] < self.period
+                }
+        if suppressed:
+            record = copy.copy(record)
+            record.msg = "%s (%s similar records suppressed)" % (
+                record.getMessage(),
+                suppressed,
+            )
+            record.args = None
+            return record
+        return True
@@ -0,0 +1,108 @@
+"""
+Send email from Celery workers instead of during requests.
+
+Set EMAIL_BACKEND to "apps.utils.mail.CeleryEmailBackend" to queue messages,
+and QUEUED_EMAIL_BACKEND to the backend workers send them with.
+"""
+
+import base64
+import functools
+import uuid
+from email import message_from_bytes
+from email.message import Message
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+
+class ParsedMessage(MIMEMixin, Message):
+    pass
+
+
+class QueuedEmailMessage(EmailMessage):
+    """
+    An email message that was rendered to MIME before it was queued, so
+    attachments & alternatives don't need serializing separately.
+    """
+
+    def __init__(self, mime, **kwargs):
+        super().__init__(**kwargs)
+        self.mime = mime
+
+    def message(self):
+        message = message_from_bytes(self.mime, _class=ParsedMessage)
+        # Headers added by the sending backend, e.g. django_ses'
+        # X-SES-CONFIGURATION-SET
+        for name, value in self.extra_headers.items():
+            if name not in message:
+                message[name] = value
+        return message
+
+
+def serialize_message(message):
+    return {
+        # Identifies the message when its task is run again
+        "id": uuid.uuid4().hex,
+        "from_email": message.from_email,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "mime": base64.b64encode(message.message().as_bytes()).decode(),
+    }
+
+
+def deserialize_message(data):
+    return QueuedEmailMessage(
+        base64.b64decode(data["mime"]),
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+    )
+
+
+class CeleryEmailBackend(BaseEmailBackend):
+    """
+    Queue the messages of each send_messages() call as one
+    apps.utils.tasks.send_emails task once the current transaction commits.
+    Workers send each batch over a connection that stays open between
+    batches, and retry the messages that fail with exponential backoff.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        messages = [serialize_message(message) for message in email_messages]
+        transaction.on_commit(functools.partial(self._queue, messages))
+        return len(email_messages)
+
+    def _queue(self, messages):
+        from .tasks import send_emails
+
+        try:
+            send_emails.apply_async((messages,))
+        except Exception:
+            if not self.fail_silently:
+                raise
+
+
+@functools.cache
+def get_queued_email_backend():
+    """
+    Return the open QUEUED_EMAIL_BACKEND connection of this process. It stays
+    open between batches, e.g. so SES' HTTPS connections are reused.
+    """
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    connection.open()
+    return connection
+
+
+@receiver(setting_changed)
+def clear_queued_email_backend(*, setting, **kwargs):
+    if setting == "QUEUED_EMAIL_BACKEND":
+        get_queued_email_backend.cache_clear()
@@ -0,0 +1,213 @@
+import http.client
+import importlib.util
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+SERVER_MODES = {
+    "wsgi": ("WSGI_APPLICATION", "sync"),
+    "asgi": ("ASGI_APPLICATION", "uvicorn_worker.UvicornWorker"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of gunicorn serving the WSGI application with "
+        "sync workers against the ASGI application with uvicorn workers, for "
+        "the same concurrent requests. Best run against I/O-bound endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            metavar="path",
+            default=["/", "/v1/accounts/me/"],
+            help='Paths to request. Default is "/" and "/v1/accounts/me/".',
+        )
+        parser.add_argument(
+            "--concurrency",
+            action="store",
+            dest="concurrency",
+            type=int,
+            default=32,
+            help="Number of concurrent requests. Default is 32.",
+        )
+        parser.add_argument(
+            "--duration",
+            action="store",
+            dest="duration",
+            type=float,
+            default=5,
+            help="Seconds to send requests to each path for. Default is 5.",
+        )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            dest="workers",
+            type=int,
+            default=2,
+            help="Number of gunicorn workers. Default is 2.",
+        )
+        parser.add_argument(
+            "--user",
+            action="store",
+            dest="user",
+            help="Email address of a user to send requests as.",
+        )
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec("uvicorn_worker") is None:
+            raise CommandError("ASGI mode requires uvicorn-worker to be installed.")
+        headers = {
+            # Requests must pass the ALLOWED_HOSTS check
+            "Host": next(
+                (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"),
+                "localhost",
+            ),
+        }
+        if options["user"]:
+            headers["Cookie"] = "%s=%s" % (
+                settings.SESSION_COOKIE_NAME,
+                self.create_session(options["user"]),
+            )
+
+        for mode in SERVER_MODES:
+            with self.run_server(mode, options["workers"]) as port:
+                for path in options["paths"]:
+                    results = self.benchmark(port, path, headers, options)
+                    self.stdout.write(
+                        "%s %s: %.0f requests/s, p50 %.1fms, p99 %.1fms, "
+                        "%s errors" % (mode, path, *results)
+                    )
+
+    def create_session(self, email):
+        UserModel = get_user_model()
+        manager = UserModel._default_manager
+        try:
+            user = manager.get(email=manager.normalize_email(email))
+        except UserModel.DoesNotExist:
+            raise CommandError("User %s doesn't exist." % email)
+        session = import_string(settings.SESSION_ENGINE + ".SessionStore")()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    @contextmanager
+    def run_server(self, mode, workers, timeout=30):
+        """
+        Start gunicorn in the given mode and yield its port once it accepts
+        connections.
+        """
+        setting, worker_class = SERVER_MODES[mode]
+        module, name = getattr(settings, setting).rsplit(".", 1)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "--bind",
+                "127.0.0.1:%s" % port,
+                "--workers",
+                str(workers),
+                "--worker-class",
+                worker_class,
+                "%s:%s" % (module, name),
+            ],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                if process.poll() is not None:
+                    raise CommandError(
+                        "gunicorn exited with status %s." % process.returncode
+                    )
+                if time.monotonic() > deadline:
+                    raise CommandError(
+                        "gunicorn didn't start within %s seconds." % timeout
+                    )
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            yield port
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def benchmark(self, port, path, headers, options):
+        def request():
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status < 500
+            except OSError:
+                return False
+            finally:
+                connection.close()
+
+        # Warm up every worker
+        for _ in range(options["workers"] * 2):
+            request()
+
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options["duration"]
+
+        def run():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                ok = request()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    errors += not ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            for _ in range(options["concurrency"]):
+                executor.submit(run)
+        elapsed = time.perf_counter() - start
+
+        percentiles = (
+            statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        )
+        return (
+            len(latencies) / elapsed,
+            percentiles[49] * 1000 if percentiles else 0,
+            percentiles[98] * 1000 if percentiles else 0,
+            errors,
+        )
@@ -0,0 +1,141 @@
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SQLite read & write throughput of Django's defaults against a "
+        "database's configured OPTIONS and CONN_MAX_AGE, using a temporary "
+        "database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            action="store",
+            dest="database",
+            default=DEFAULT_DB_ALIAS,
+            help='Database whose settings to benchmark. Default is "default".',
+        )
+        parser.add_argument(
+            "--operations",
+            action="store",
+            dest="operations",
+            type=int,
+            default=500,
+            help="Number of operations per thread. Default is 500.",
+        )
+        parser.add_argument(
+            "--readers",
+            action="store",
+            dest="readers",
+            type=int,
+            default=4,
+            help="Number of reading threads. Default is 4.",
+        )
+        parser.add_argument(
+            "--writers",
+            action="store",
+            dest="writers",
+            type=int,
+            default=2,
+            help="Number of writing threads. Default is 2.",
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES[options["database"]]
+        if database["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("%s isn't a SQLite database." % options["database"])
+
+        profiles = [
+            ("before", {}, 0),
+            ("after", database.get("OPTIONS", {}), database.get("CONN_MAX_AGE", 0)),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, db_options, conn_max_age in profiles:
+                path = Path(tmp_dir) / ("%s.sqlite3" % name)
+                results = self.benchmark(path, db_options, conn_max_age, options)
+                self.stdout.write(
+                    "%s: %.0f reads/s, %.0f writes/s, %s lock errors" % (name, *results)
+                )
+
+    def connect(self, path, db_options):
+        # Mirror how Django opens SQLite connections: autocommit, with an
+        # explicit BEGIN for transactions.
+        connection = sqlite3.connect(
+            path,
+            timeout=db_options.get("timeout", 5),
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if db_options.get("init_command"):
+            connection.executescript(db_options["init_command"])
+        return connection
+
+    def benchmark(self, path, db_options, conn_max_age, options):
+        connection = self.connect(path, db_options)
+        connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, value TEXT)")
+        connection.executemany(
+            "INSERT INTO item (value) VALUES (?)", [("x" * 100,)] * 1000
+        )
+        connection.close()
+
+        begin = "BEGIN %s" % db_options.get("transaction_mode", "")
+        errors = 0
+        lock = threading.Lock()
+
+        def run(write):
+            nonlocal errors
+            connection = None
+            count = 0
+            start = time.perf_counter()
+            for _ in range(options["operations"]):
+                # Without CONN_MAX_AGE every request opens a new connection
+                if connection is None:
+                    connection = self.connect(path, db_options)
+                try:
+                    if write:
+                        connection.execute(begin)
+                        connection.execute(
+                            "INSERT INTO item (value) VALUES (?)", ("x" * 100,)
+                        )
+                        connection.execute("COMMIT")
+                    else:
+                        connection.execute(
+                            "SELECT value FROM item WHERE id = ?",
+                            (random.randint(1, 1000),),
+                        ).fetchone()
+                    count += 1
+                except sqlite3.OperationalError:
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                    with lock:
+                        errors += 1
+                if not conn_max_age:
+                    connection.close()
+                    connection = None
+            if connection is not None:
+                connection.close()
+            return count, time.perf_counter() - start
+
+        workers = [False] * options["readers"] + [True] * options["writers"]
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            results = list(executor.map(run, workers))
+
+        def rate(results):
+            if not results:
+                return 0
+            return sum(count for count, _ in results) / max(t for _, t in results)
+
+        reads = [result for result, write in zip(results, workers) if not write]
+        writes = [result for result, write in zip(results, workers) if write]
+        return rate(reads), rate(writes), errors
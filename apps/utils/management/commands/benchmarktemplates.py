@@ -0,0 +1,61 @@
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the render time of templates loaded from disk on every render "
+        "against templates kept compiled by the cached loader."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "template_names",
+            nargs="*",
+            metavar="template_name",
+            default=["site/home.html"],
+            help='Templates to render. Default is "site/home.html".',
+        )
+        parser.add_argument(
+            "--number",
+            action="store",
+            dest="number",
+            type=int,
+            default=100,
+            help="Number of renders per template. Default is 100.",
+        )
+
+    def handle(self, *args, **options):
+        backend = engines["django"]
+        # Templates may call request.get_host(), which checks ALLOWED_HOSTS
+        host = next(
+            (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost"
+        )
+        request = RequestFactory().get("/", HTTP_HOST=host)
+        number = options["number"]
+
+        def reset_loaders():
+            for loader in backend.engine.template_loaders:
+                if hasattr(loader, "reset"):
+                    loader.reset()
+
+        for name in options["template_names"]:
+
+            def render():
+                backend.get_template(name).render({}, request)
+
+            def render_uncached():
+                reset_loaders()
+                render()
+
+            uncached = timeit.timeit(render_uncached, number=number) / number
+            render()
+            cached = timeit.timeit(render, number=number) / number
+            self.stdout.write(
+                "%s: %.2fms uncached, %.2fms cached"
+                % (name, uncached * 1000, cached * 1000)
+            )
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Clear the given caches, or every configured cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "aliases",
+            nargs="*",
+            metavar="alias",
+            help="Cache aliases to clear. Defaults to every cache in CACHES.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or list(settings.CACHES)
+        for alias in aliases:
+            if alias not in settings.CACHES:
+                raise CommandError("Unknown cache alias: %s" % alias)
+            caches[alias].clear()
+            if options["verbosity"] >= 1:
+                self.stdout.write("Cleared the %s cache." % alias)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.utils.template_cache import compile_templates
+
+
+class Command(BaseCommand):
+    help = "Compile every template, failing if any of them has an error."
+
+    def handle(self, *args, **options):
+        compiled, errors = compile_templates()
+        for name, error in errors.items():
+            self.stderr.write("%s: %s" % (name, error))
+        if errors:
+            raise CommandError("%s template(s) failed to compile." % len(errors))
+        if options["verbosity"] >= 1:
+            self.stdout.write("Compiled %s template(s)." % len(compiled))
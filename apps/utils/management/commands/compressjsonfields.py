@@ -0,0 +1,85 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.utils.models import JSONModelField
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite stored JSON field values using each field's current compression "
+        "setting. Rows are rewritten in batches, ordered by primary key."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "model_labels",
+            nargs="*",
+            metavar="app_label.ModelName",
+            help=(
+                "Models to rewrite. Defaults to every model with a compressed "
+                "JSON field."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            dest="batch_size",
+            type=int,
+            default=1000,
+            help="Number of rows to rewrite per query. Default is 1000.",
+        )
+        parser.add_argument(
+            "--database",
+            action="store",
+            dest="database",
+            default=DEFAULT_DB_ALIAS,
+            help='Specifies the database to use. Default is "default".',
+        )
+
+    def handle(self, *args, **options):
+        if options["model_labels"]:
+            try:
+                models = [apps.get_model(label) for label in options["model_labels"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = [
+                model
+                for model in apps.get_models()
+                if any(field.compression for field in self.get_json_fields(model))
+            ]
+
+        for model in models:
+            fields = [field.name for field in self.get_json_fields(model)]
+            if not fields:
+                raise CommandError("%s has no JSON fields." % model._meta.label)
+            count = self.rewrite(
+                model, fields, options["database"], options["batch_size"]
+            )
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    "Rewrote %s %s row(s)." % (count, model._meta.label),
+                )
+
+    def get_json_fields(self, model):
+        return [
+            field
+            for field in model._meta.concrete_fields
+            if isinstance(field, JSONModelField)
+        ]
+
+    def rewrite(self, model, fields, database, batch_size):
+        # The base manager doesn't bump CreatedModifiedModel.modified_at
+        manager = model._base_manager.db_manager(database)
+        queryset = manager.only(*fields).order_by("pk")
+        count = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            objs = list(batch[:batch_size])
+            if not objs:
+                return count
+            manager.bulk_update(objs, fields)
+            count += len(objs)
+            last_pk = objs[-1].pk
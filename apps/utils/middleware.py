@@ -0,0 +1,61 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .routers import pinned_to_primary, wrote_to_primary
+
+
+class ReplicaPinningMiddleware:
+    """
+    Scope ReplicaRouter's read-after-write pinning to a request. Once a request
+    writes, a short-lived cookie keeps the client's following requests (e.g.
+    the redirect after a POST) reading from the primary database too.
+    """
+
+    cookie_name = "pin_primary"
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pinned_token = pinned_to_primary.set(self.cookie_name in request.COOKIES)
+        wrote_token = wrote_to_primary.set(False)
+        try:
+            response = self.get_response(request)
+            self.process_response(request, response)
+        finally:
+            pinned_to_primary.reset(pinned_token)
+            wrote_to_primary.reset(wrote_token)
+        return response
+
+    async def __acall__(self, request):
+        # Queries run in sync_to_async() threads, which copy their context
+        # variables back to this task when they finish.
+        pinned_token = pinned_to_primary.set(self.cookie_name in request.COOKIES)
+        wrote_token = wrote_to_primary.set(False)
+        try:
+            response = await self.get_response(request)
+            self.process_response(request, response)
+        finally:
+            pinned_to_primary.reset(pinned_token)
+            wrote_to_primary.reset(wrote_token)
+        return response
+
+    def process_response(self, request, response):
+        if wrote_to_primary.get():
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
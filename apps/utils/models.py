@@ -1,53 +1,268 @@
+import copy
+import functools
 import json
 
 from django import forms
+from django.core import checks
 from django.db import models
+from django.db.models import expressions
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.json import KT, KeyTransform
+from django.db.models.query_utils import DeferredAttribute
 from django.core import exceptions
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .json_codecs import (
+    COMPRESSIONS,
+    CodecJSONEncoder,
+    compress_json,
+    decompress_json,
+    get_json_codec,
+)
+from .json_schema import get_schema_validator
+
+
+class LazyJSONQuerySetMixin:
+    """
+    Decode lazy JSON fields (see JSONModelField) eagerly in values() and
+    values_list() results, since only model instances decode them on access.
+    """
+
+    def values(self, *fields, **expressions):
+        return self._load_lazy_json(super().values(*fields, **expressions))
+
+    def values_list(self, *fields, **kwargs):
+        return self._load_lazy_json(super().values_list(*fields, **kwargs))
+
+    def _load_lazy_json(self, queryset):
+        if any(getattr(f, "lazy", False) for f in self.model._meta.concrete_fields):
+            queryset._iterable_class = get_loading_iterable(queryset._iterable_class)
+        return queryset
+
+
+def load_lazy_json(value):
+    return value.load() if isinstance(value, LazyJSON) else value
+
+
+@functools.cache
+def get_loading_iterable(iterable_class):
+    """
+    Return a subclass of a values() iterable class that decodes the LazyJSON
+    values of each row.
+    """
+
+    def __iter__(self):
+        for row in iterable_class.__iter__(self):
+            if isinstance(row, dict):
+                yield {key: load_lazy_json(value) for key, value in row.items()}
+            elif isinstance(row, tuple):
+                values = [load_lazy_json(value) for value in row]
+                # Named tuples from values_list(named=True)
+                yield row._make(values) if hasattr(row, "_make") else tuple(values)
+            else:
+                yield load_lazy_json(row)
+
+    return type(
+        "Loading" + iterable_class.__name__, (iterable_class,), {"__iter__": __iter__}
+    )
+
+
+class CreatedModifiedQuerySet(LazyJSONQuerySetMixin, models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Stamp modified_at the same way save() does on create. On conflict
+        updates, make sure modified_at is written too.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.modified_at = obj.created_at
+        update_fields = kwargs.get("update_fields")
+        if update_fields and "modified_at" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "modified_at"]
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """
+        Stamp every object with the same modified_at and include it in the
+        fields written by the batched UPDATE, unless it's given explicitly.
+        """
+        if "modified_at" not in fields:
+            objs = list(objs)
+            now = timezone.now()
+            for obj in objs:
+                obj.modified_at = now
+            fields = [*fields, "modified_at"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        """
+        Bump modified_at as part of the same UPDATE statement, unless it's
+        given explicitly.
+        """
+        kwargs.setdefault("modified_at", timezone.now())
+        return super().update(**kwargs)
+
+    def changed_since(self, ts, after_pk=None, limit=100):
+        """
+        Keyset pagination over rows modified at or after ts, ordered by
+        (modified_at, pk). To get the next page, pass the modified_at and pk of
+        the last row of the previous page.
+        """
+        if after_pk is None:
+            queryset = self.filter(modified_at__gte=ts)
+        else:
+            queryset = self.filter(
+                models.Q(modified_at__gt=ts) | models.Q(modified_at=ts, pk__gt=after_pk)
+            )
+        queryset = queryset.order_by("modified_at", "pk")
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
+
+
+CreatedModifiedManager = models.Manager.from_queryset(CreatedModifiedQuerySet)
+
 
 # Create your models here.
 class CreatedModifiedModel(models.Model):
-    created_at = models.DateTimeField(default=timezone.now, editable=False)
-    modified_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(
+        default=timezone.now, editable=False, db_index=True
+    )
+    modified_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = CreatedModifiedManager()
+
+    # Set to True on a subclass to only save the fields that changed since the
+    # instance was loaded, and to skip the UPDATE entirely if nothing changed.
+    track_changes = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.track_changes:
+            instance._store_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if self.track_changes:
+            self._store_loaded_values(fields)
+
+    def _store_loaded_values(self, fields=None):
+        """
+        Snapshot the current values of the given fields, or of every loaded
+        field if fields is None.
+        """
+        if not hasattr(self, "_loaded_values"):
+            self._loaded_values = {}
+        for field in self._meta.concrete_fields:
+            if fields is not None and not {field.name, field.attname} & set(fields):
+                continue
+            if field.attname not in self.__dict__:
+                # Deferred field
+                continue
+            value = self.__dict__[field.attname]
+            if isinstance(value, (dict, list)):
+                # Mutable JSON values may be changed in place
+                value = copy.deepcopy(value)
+            self._loaded_values[field.attname] = value
+
+    def get_changed_fields(self):
+        """
+        Return the names of the fields that changed since the instance was
+        loaded, or None if the instance isn't tracked.
+        """
+        loaded_values = getattr(self, "_loaded_values", None)
+        if loaded_values is None:
+            return None
+        changed_fields = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname == "modified_at":
+                continue
+            if field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded_values:
+                changed_fields.append(field.attname)
+                continue
+            loaded_value = loaded_values[field.attname]
+            value = self.__dict__[field.attname]
+            # Identity check first to not decode untouched LazyJSON values
+            if loaded_value is not value and loaded_value != value:
+                changed_fields.append(field.attname)
+        return changed_fields
 
     def save(self, *args, **kwargs):
+        if (
+            self.track_changes
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = self.get_changed_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            if not update_fields:
+                # Nothing to save
+                return
+            if "modified_at" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "modified_at"]
+
         if not self.pk:
             self.modified_at = self.created_at
         else:
             self.modified_at = timezone.now()
         super().save(*args, **kwargs)
 
+        if self.track_changes:
+            self._store_loaded_values(kwargs.get("update_fields"))
+
     class Meta:
         abstract = True
 
 
+class SubmittedJSON(str):
+    pass
+
+
 class JSONFormField(forms.JSONField):
+    default_error_messages = {
+        "schema": _("Value does not match the schema: %(error)s"),
+    }
 
-    def __init__(self, empty_value=None, **kwargs):
+    def __init__(self, empty_value=None, schema=None, **kwargs):
         super().__init__(**{"empty_value": None, **kwargs})
+        if self.encoder is None:
+            self.encoder = CodecJSONEncoder
+        self.schema_validator = get_schema_validator(schema)
 
     def is_valid(self, value):
         return isinstance(value, (list, dict, int, float, forms.JSONString))
 
+    def loads(self, value):
+        if self.decoder is not None:
+            return json.loads(value, cls=self.decoder)
+        return get_json_codec().loads(value)
+
     def to_python(self, value):
         if self.disabled:
             return value
-        try:
-            # Try load JSON from string
-            converted = json.loads(value, cls=self.decoder)
-            if isinstance(converted, str):
-                converted = forms.JSONString(converted)
-        except json.JSONDecodeError:
-            # Invalid JSON
-            converted = forms.fields.InvalidJSONInput(value)
-        except TypeError:
+        if isinstance(value, (str, bytes, bytearray)):
+            try:
+                # Try load JSON from string
+                converted = self.loads(value)
+                if isinstance(converted, str):
+                    converted = forms.JSONString(converted)
+            except ValueError:
+                # Invalid JSON
+                converted = forms.fields.InvalidJSONInput(value)
+        else:
             # Not a string
             converted = value
         if converted in self.empty_values:
             return self.empty_value
         elif self.is_valid(converted):
+            self.validate_schema(converted)
             return converted
         raise exceptions.ValidationError(
             self.error_messages["invalid"],
@@ -55,18 +270,31 @@ class JSONFormField(forms.JSONField):
             params={"value": value},
         )
 
+    def validate_schema(self, value):
+        if self.schema_validator is None:
+            return
+        try:
+            self.schema_validator(value)
+        except ValueError as e:
+            raise exceptions.ValidationError(
+                self.error_messages["schema"],
+                code="schema",
+                params={"value": value, "error": e},
+            )
+
     def bound_data(self, data, initial):
         if self.disabled:
             return initial
-        try:
-            # Try load JSON from string
-            value = json.loads(data, cls=self.decoder)
-            if not self.is_valid(value):
-                raise ValueError(value)
-        except (json.JSONDecodeError, ValueError):
-            return forms.fields.InvalidJSONInput(data)
-        else:
+        if data is None:
+            return None
+        # Rendered back as submitted, so that only to_python() parses the
+        # payload and changes made to cleaned_data don't show in the form.
+        return SubmittedJSON(data)
+
+    def prepare_value(self, value):
+        if isinstance(value, SubmittedJSON):
             return value
+        return super().prepare_value(value)
 
 
 class JSONObjectFormField(JSONFormField):
@@ -89,21 +317,286 @@ class JSONArrayFormField(JSONFormField):
         return isinstance(value, (list,))
 
 
-class JSONObjectField(models.JSONField):
-    description = _("A JSON object")
+NOT_LOADED = object()
+
+
+class LazyJSON:
+    """
+    An undecoded JSON value from the database, decoded on first use.
+
+    Model attributes are swapped for the decoded value on first access (see
+    LazyJSONAttribute), and LazyJSONQuerySetMixin decodes values() and
+    values_list() results, so this proxy shouldn't be seen outside a model's
+    __dict__.
+    """
+
+    __slots__ = ("raw", "decode", "_value")
+
+    def __init__(self, raw, decode):
+        self.raw = raw
+        self.decode = decode
+        self._value = NOT_LOADED
+
+    def load(self):
+        """Decode a new copy of the value."""
+        return self.decode(self.raw)
+
+    @property
+    def value(self):
+        if self._value is NOT_LOADED:
+            self._value = self.load()
+        return self._value
+
+    def __getattr__(self, name):
+        # Not for slots, which are missing until __init__() sets them, e.g.
+        # on copies, nor for special methods that copy & pickle look up.
+        if name in self.__slots__ or (name.startswith("__") and name.endswith("__")):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __reduce__(self):
+        # Copies & unpickled values are undecoded too
+        return (LazyJSON, (self.raw, self.decode))
+
+    def __copy__(self):
+        return LazyJSON(self.raw, self.decode)
+
+    def __deepcopy__(self, memo):
+        # load() decodes a new value for each copy, so nothing is shared
+        return LazyJSON(self.raw, self.decode)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyJSON):
+            other = other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class LazyJSONAttribute(DeferredAttribute):
+    """
+    Decodes a LazyJSON value the first time the attribute is accessed. It's a
+    data descriptor so that it's used even when the value is already loaded
+    into the instance's __dict__.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, LazyJSON):
+            value = instance.__dict__[self.field.attname] = value.load()
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class JSONQuerySet(LazyJSONQuerySetMixin, models.QuerySet):
+
+    def with_json_keys(self, **lookups):
+        """
+        Annotate keys extracted from JSON fields by the database, e.g.
+        with_json_keys(theme="settings__theme"), and defer the JSON fields
+        they come from so the full payloads aren't fetched.
+        """
+        deferred_fields = set()
+        for lookup in lookups.values():
+            field_name = lookup.split(LOOKUP_SEP, 1)[0]
+            try:
+                field = self.model._meta.get_field(field_name)
+            except exceptions.FieldDoesNotExist:
+                continue
+            if isinstance(field, models.JSONField):
+                if getattr(field, "compression", None) is not None:
+                    # KT() doesn't go through get_transform()
+                    raise exceptions.FieldError(
+                        "Compressed JSON field %r can't be queried." % field_name
+                    )
+                deferred_fields.add(field_name)
+        queryset = self.annotate(
+            **{alias: KT(lookup) for alias, lookup in lookups.items()}
+        )
+        if deferred_fields:
+            queryset = queryset.defer(*deferred_fields)
+        return queryset
+
+
+JSONManager = models.Manager.from_queryset(JSONQuerySet)
+
+
+class JSONModelField(models.JSONField):
     default_error_messages = {
-        "invalid": _("Value must be a valid JSON object."),
+        "schema": _("Value does not match the schema: %(error)s"),
     }
-    empty_values = [None, ""]
+
+    def __init__(self, *args, schema=None, lazy=False, compression=None, **kwargs):
+        """
+        schema is a JSON Schema (see apps.utils.json_schema), or a validator
+        callable that raises a ValueError for invalid values. It's compiled
+        once here rather than every time a value is validated.
+
+        With lazy=True, values loaded from the database are only decoded when
+        the attribute is first accessed. The model's default manager must use
+        a queryset with LazyJSONQuerySetMixin, e.g. JSONManager.
+
+        compression ("zlib" or "zstd") stores large values compressed. The
+        database can't read compressed values, so compressed fields can't be
+        queried: lookups other than isnull and transforms raise a FieldError.
+        Compressed values are only decompressed while compression is set.
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression: %r" % compression)
+        self.compression = compression
+        self.schema = schema
+        self.schema_validator = get_schema_validator(schema)
+        self.lazy = lazy
+        if lazy:
+            self.descriptor_class = LazyJSONAttribute
+        super().__init__(*args, **kwargs)
+
+    def get_lookup(self, lookup_name):
+        if self.compression is not None and lookup_name != "isnull":
+            raise exceptions.FieldError(
+                "Compressed JSON field %r can't be queried." % self.name
+            )
+        return super().get_lookup(lookup_name)
+
+    def get_transform(self, name):
+        if self.compression is not None:
+            raise exceptions.FieldError(
+                "Compressed JSON field %r can't be queried." % self.name
+            )
+        return super().get_transform(name)
+
+    def check(self, **kwargs):
+        return [*super().check(**kwargs), *self._check_lazy_manager()]
+
+    def _check_lazy_manager(self):
+        if not self.lazy or self.model._meta.abstract:
+            return []
+        queryset_class = type(self.model._default_manager.get_queryset())
+        if issubclass(queryset_class, LazyJSONQuerySetMixin):
+            return []
+        return [
+            checks.Error(
+                "Lazy JSON fields need a default manager whose queryset decodes "
+                "them in values() results.",
+                hint="Use JSONManager, or add LazyJSONQuerySetMixin to the "
+                "queryset of %s's default manager." % self.model.__name__,
+                obj=self,
+                id="utils.E001",
+            )
+        ]
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        # Validator callables are left out, since migrations can't serialize
+        # e.g. lambdas and closures. They don't change the column anyway.
+        if self.schema is not None and not callable(self.schema):
+            kwargs["schema"] = self.schema
+        if self.lazy:
+            kwargs["lazy"] = True
+        if self.compression is not None:
+            kwargs["compression"] = self.compression
+        return name, path, args, kwargs
+
+    def is_valid(self, value):
+        return True
 
     def validate(self, value, model_instance):
         super().validate(value, model_instance)
-        if value is not None and not isinstance(value, (dict,)):
+        if value is None:
+            return
+        if not self.is_valid(value):
             raise exceptions.ValidationError(
                 self.error_messages["invalid"],
                 code="invalid",
                 params={"value": value},
             )
+        if self.schema_validator is not None:
+            try:
+                self.schema_validator(value)
+            except ValueError as e:
+                raise exceptions.ValidationError(
+                    self.error_messages["schema"],
+                    code="schema",
+                    params={"value": value, "error": e},
+                )
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"schema": self.schema, **kwargs})
+
+    def decode(self, value):
+        try:
+            text = value
+            if self.compression is not None:
+                # Whichever compression the value was stored with
+                text = decompress_json(value)
+            if self.decoder is not None:
+                return json.loads(text, cls=self.decoder)
+            return get_json_codec().loads(text)
+        except ValueError:
+            return value
+
+    def from_db_value(self, value, expression, connection):
+        if not isinstance(value, (str, bytes)):
+            return super().from_db_value(value, expression, connection)
+        if self.lazy and not isinstance(expression, KeyTransform):
+            return LazyJSON(value, self.decode)
+        return self.decode(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, LazyJSON):
+            value = value.value
+        return super().get_prep_value(value)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        # Same as JSONField.get_db_prep_value(), but encodes with the
+        # configured codec unless a custom encoder is set.
+        if not prepared:
+            value = self.get_prep_value(value)
+        if isinstance(value, expressions.Value) and isinstance(
+            value.output_field, models.JSONField
+        ):
+            value = value.value
+        elif hasattr(value, "as_sql"):
+            return value
+        encoder = self.encoder or CodecJSONEncoder
+        if self.compression is not None and value is not None:
+            compressed = compress_json(json.dumps(value, cls=encoder), self.compression)
+            if compressed is not None:
+                value = compressed
+        return connection.ops.adapt_json_value(value, encoder)
+
+
+class JSONObjectField(JSONModelField):
+    description = _("A JSON object")
+    default_error_messages = {
+        "invalid": _("Value must be a valid JSON object."),
+    }
+    empty_values = [None, ""]
+
+    def is_valid(self, value):
+        return isinstance(value, (dict,))
 
     def formfield(self, **kwargs):
         return super().formfield(
@@ -115,21 +608,15 @@ class JSONObjectField(models.JSONField):
         )
 
 
-class JSONArrayField(models.JSONField):
+class JSONArrayField(JSONModelField):
     description = _("A JSON array")
     default_error_messages = {
         "invalid": _("Value must be a valid JSON array."),
     }
     empty_values = [None, ""]
 
-    def validate(self, value, model_instance):
-        super().validate(value, model_instance)
-        if value is not None and not isinstance(value, (list,)):
-            raise exceptions.ValidationError(
-                self.error_messages["invalid"],
-                code="invalid",
-                params={"value": value},
-            )
+    def is_valid(self, value):
+        return isinstance(value, (list,))
 
     def formfield(self, **kwargs):
         return super().formfield(
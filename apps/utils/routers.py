@@ -0,0 +1,51 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Whether reads in the current context should go to the primary database.
+pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+# Whether anything was written during the current request, or None outside of
+# ReplicaPinningMiddleware.
+wrote_to_primary = ContextVar("wrote_to_primary", default=None)
+
+
+@contextmanager
+def use_primary():
+    """
+    Route all reads inside the block to the primary database. To do the same
+    for a single queryset, use queryset.using(DEFAULT_DB_ALIAS).
+    """
+    token = pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        pinned_to_primary.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send writes to the default database and reads to one of the aliases in
+    the DATABASE_REPLICAS setting. After a write during a request, reads stick
+    to the default database so the written data can be read back straight
+    away.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if wrote_to_primary.get() is not None:
+            pinned_to_primary.set(True)
+            wrote_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
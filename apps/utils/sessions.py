@@ -0,0 +1,76 @@
+"""
+A session engine that reads sessions from the SESSION_CACHE_ALIAS cache and
+writes them through to the database, like Django's cached_db engine. Unlike
+cached_db, it doesn't rewrite sessions whose data didn't change and it
+deletes expired sessions in batches.
+
+Sessions are loaded lazily: a request that never reads request.session
+doesn't touch the cache or the database.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+
+class SessionStore(CachedDBStore):
+
+    # Expired sessions deleted per query by clear_expired()
+    clear_expired_batch_size = 1000
+
+    def _dump(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._loaded_data = self._dump(data)
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._loaded_data = self._dump(data)
+        return data
+
+    def is_unchanged(self):
+        """
+        Return True if the session's data is the same as when it was loaded,
+        e.g. because a view set a key to the value it already had.
+        """
+        return (
+            not settings.SESSION_SAVE_EVERY_REQUEST
+            and self.session_key is not None
+            and getattr(self, "_loaded_data", None) == self._dump(self._session)
+        )
+
+    def save(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        super().save(must_create)
+        self._loaded_data = self._dump(self._session)
+
+    async def asave(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        await super().asave(must_create)
+        self._loaded_data = self._dump(self._session)
+
+    @classmethod
+    def clear_expired(cls, batch_size=None):
+        """
+        Delete expired sessions, a batch per query so that the database isn't
+        locked for long. Return the number of deleted sessions.
+        """
+        batch_size = batch_size or cls.clear_expired_batch_size
+        model = cls.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        count = 0
+        while True:
+            keys = list(expired.values_list("pk", flat=True)[:batch_size])
+            if not keys:
+                return count
+            count += model.objects.filter(pk__in=keys).delete()[0]
+
+    @classmethod
+    async def aclear_expired(cls, batch_size=None):
+        return await sync_to_async(cls.clear_expired)(batch_size)
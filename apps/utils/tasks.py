@@ -0,0 +1,76 @@
+import logging
+from importlib import import_module
+
+from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.cache import cache
+
+from .mail import deserialize_message, get_queued_email_backend
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def clear_expired_sessions():
+    """
+    Delete expired sessions, like the clearsessions command. With
+    apps.utils.sessions, they're deleted in batches.
+    """
+    engine = import_module(settings.SESSION_ENGINE)
+    return engine.SessionStore.clear_expired()
+
+
+# Seconds a sent message is remembered, so it isn't sent again if its task is
+# redelivered or retried
+SENT_EMAIL_SECONDS = 60 * 60 * 24
+
+
+def get_sent_email_key(data):
+    return "utils:send_emails:%s" % data["id"]
+
+
+@shared_task(
+    bind=True,
+    max_retries=6,
+    # Seconds before the first retry, doubling up to retry_backoff_max
+    retry_backoff=10,
+    retry_backoff_max=60 * 10,
+)
+def send_emails(self, messages):
+    """
+    Send a batch of messages queued by apps.utils.mail.CeleryEmailBackend
+    over this process' QUEUED_EMAIL_BACKEND connection, which stays open
+    for the process' next batches. Messages that fail are retried together.
+
+    Tasks are acknowledged after they run, so a task whose worker was lost is
+    run again. Messages it already sent are skipped.
+    """
+    sent = cache.get_many([get_sent_email_key(data) for data in messages])
+    failed = []
+    for data in messages:
+        if get_sent_email_key(data) in sent:
+            continue
+        message = deserialize_message(data)
+        try:
+            get_queued_email_backend().send_messages([message])
+        except Exception:
+            logger.exception("Error sending email to %s", message.recipients())
+            failed.append(data)
+            # Reconnect in case the connection broke
+            get_queued_email_backend.cache_clear()
+        else:
+            cache.set(get_sent_email_key(data), True, SENT_EMAIL_SECONDS)
+    if not failed:
+        return len(messages)
+    if self.request.retries >= self.max_retries:
+        logger.error("Gave up sending %s email(s)", len(failed))
+        return len(messages) - len(failed)
+    countdown = get_exponential_backoff_interval(
+        self.retry_backoff,
+        self.request.retries,
+        self.retry_backoff_max,
+        full_jitter=True,
+    )
+    raise self.retry(args=(failed,), countdown=countdown)
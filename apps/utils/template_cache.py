@@ -0,0 +1,61 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_names(backend):
+    """
+    Return the names of every file in the backend's template directories.
+    """
+    template_dirs = []
+    for loader in backend.engine.template_loaders:
+        # Also covers the loaders wrapped by the cached loader
+        if hasattr(loader, "get_dirs"):
+            template_dirs.extend(loader.get_dirs())
+    names = set()
+    for template_dir in template_dirs:
+        template_dir = Path(template_dir)
+        for path in template_dir.rglob("*"):
+            if path.is_file():
+                names.add(path.relative_to(template_dir).as_posix())
+    return sorted(names)
+
+
+def compile_templates():
+    """
+    Load every template into the template engines' loaders, which keeps them
+    compiled in memory when the cached loader is used. Return the names of the
+    compiled templates and a dict of names to errors for templates that didn't
+    compile.
+    """
+    compiled = []
+    errors = {}
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in get_template_names(backend):
+            try:
+                backend.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                errors[name] = e
+            else:
+                compiled.append(name)
+    return compiled, errors
+
+
+def preload_templates():
+    """
+    Compile every template if the TEMPLATES_PRELOAD setting is on. Meant to
+    be called when the WSGI/ASGI application loads.
+    """
+    if not settings.TEMPLATES_PRELOAD:
+        return
+    compiled, errors = compile_templates()
+    for name, error in errors.items():
+        logger.error("Failed to compile template %s: %s", name, error)
@@ -0,0 +1,45 @@
+import uuid
+
+from django_ses import SESBackend
+
+
+class InMemorySESClient:
+    """
+    Stands in for a boto3 SES client. Keeps the messages it's asked to send,
+    and raises the exceptions in errors, in order, instead of sending.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.errors = []
+
+    def send_raw_email(self, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(kwargs)
+        return {
+            "MessageId": str(uuid.uuid4()),
+            "ResponseMetadata": {"RequestId": str(uuid.uuid4())},
+        }
+
+    def get_send_quota(self):
+        return {"MaxSendRate": 14.0}
+
+
+class InMemorySESBackend(SESBackend):
+    """
+    django_ses' backend, connecting to an InMemorySESClient instead of SES.
+    """
+
+    # Every client connected to, newest last
+    clients = []
+    # Exceptions the next client raises
+    errors = []
+
+    def open(self):
+        if self.connection:
+            return False
+        self.connection = InMemorySESClient()
+        self.connection.errors = self.errors
+        self.clients.append(self.connection)
+        return True
@@ -0,0 +1,93 @@
+import os
+import threading
+import unittest
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.utils.batches import BatchCall, BatchTask
+
+
+UserModel = get_user_model()
+
+batches = []
+flushed = threading.Event()
+
+
+# Only flushed by size or flush() in these tests
+@shared_task(base=BatchTask, flush_every=3, flush_interval=60)
+def rename_users(calls):
+    batches.append(calls)
+    users = UserModel.objects.in_bulk([call.args[0] for call in calls])
+    for call in calls:
+        users[call.args[0]].first_name = call.kwargs["first_name"]
+    UserModel.objects.bulk_update(users.values(), ["first_name"])
+
+
+@shared_task(base=BatchTask, flush_every=100, flush_interval=0.05)
+def record(calls):
+    batches.append(calls)
+    flushed.set()
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class BatchTaskTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = UserModel.objects.bulk_create(UserModel() for _ in range(3))
+
+    def setUp(self):
+        batches.clear()
+        flushed.clear()
+
+    def test_flush_every(self):
+        rename_users.buffer(self.users[0].pk, first_name="A")
+        rename_users.buffer(self.users[1].pk, first_name="B")
+        self.assertEqual(batches, [])
+        with self.assertNumQueries(2):
+            rename_users.buffer(self.users[2].pk, first_name="C")
+        self.assertEqual(
+            batches,
+            [
+                [
+                    BatchCall((self.users[0].pk,), {"first_name": "A"}),
+                    BatchCall((self.users[1].pk,), {"first_name": "B"}),
+                    BatchCall((self.users[2].pk,), {"first_name": "C"}),
+                ]
+            ],
+        )
+        self.assertQuerySetEqual(
+            UserModel.objects.order_by("pk").values_list("first_name", flat=True),
+            ["A", "B", "C"],
+        )
+
+    def test_flush(self):
+        rename_users.buffer(self.users[0].pk, first_name="A")
+        rename_users.flush()
+        self.assertEqual(len(batches), 1)
+        self.assertIsNone(rename_users.flush())
+        self.assertEqual(len(batches), 1)
+
+    def test_flush_interval(self):
+        record.buffer(1)
+        record.buffer(2)
+        self.assertTrue(flushed.wait(timeout=5))
+        self.assertEqual(batches, [[BatchCall((1,), {}), BatchCall((2,), {})]])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "Requires os.fork().")
+    def test_fork_resets_batch(self):
+        rename_users.buffer(self.users[0].pk, first_name="A")
+        pid = os.fork()
+        if pid == 0:
+            reset = rename_users._batch_timer is None and not rename_users._batch_calls
+            os._exit(0 if reset else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        # The parent still sends its batch
+        self.assertEqual(
+            rename_users._batch_calls, [((self.users[0].pk,), {"first_name": "A"})]
+        )
+        rename_users.flush()
+        self.assertEqual(len(batches), 1)
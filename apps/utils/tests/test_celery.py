@@ -0,0 +1,50 @@
+import tempfile
+from importlib import import_module
+from pathlib import Path
+
+from celery import Celery, current_app
+from django.test import SimpleTestCase, override_settings
+
+
+class CeleryConfigTest(SimpleTestCase):
+
+    def test_routes(self):
+        router = current_app.amqp.router
+        route = router.route({}, "apps.utils.tasks.clear_expired_sessions")
+        self.assertEqual(route["queue"].name, "long")
+        self.assertEqual(router.route({}, "other")["queue"].name, "default")
+
+    def test_filesystem_broker(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        folder = Path(tmp_dir.name)
+        settings = override_settings(
+            CELERY_BROKER_TRANSPORT_OPTIONS={
+                "data_folder_in": str(folder / "messages"),
+                "data_folder_out": str(folder / "messages"),
+                "control_folder": str(folder / "control"),
+            },
+            CELERY_RESULT_BACKEND="file://%s" % (folder / "results"),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        # A separate app configured like the project's
+        app = Celery(set_as_current=False)
+        app.config_from_object("django.conf:settings", namespace="CELERY")
+        project_celery = import_module("%s.celery" % current_app.main)
+        app.on_after_configure.connect(project_celery.create_filesystem_folders)
+
+        @app.task(name="apps.utils.tasks.clear_expired_sessions")
+        def task():
+            pass
+
+        task.delay()
+        with app.connection_for_read() as connection:
+            message = connection.SimpleQueue("long").get(timeout=1)
+            message.ack()
+        self.assertEqual(
+            message.headers["task"], "apps.utils.tasks.clear_expired_sessions"
+        )
+        self.assertEqual(message.headers["compression"], "application/x-gzip")
+        self.assertTrue((folder / "results").is_dir())
@@ -0,0 +1,71 @@
+from django import forms
+from django.test import SimpleTestCase, override_settings
+
+from apps.utils.json_codecs import (
+    CodecJSONEncoder,
+    StdlibJSONCodec,
+    get_json_codec,
+)
+from apps.utils.models import JSONObjectFormField
+
+
+class CountingJSONCodec(StdlibJSONCodec):
+    loads_count = 0
+
+    def loads(self, value):
+        CountingJSONCodec.loads_count += 1
+        return super().loads(value)
+
+
+@override_settings(JSON_CODEC="apps.utils.json_codecs.StdlibJSONCodec")
+class JSONCodecTest(SimpleTestCase):
+
+    def test_get_json_codec(self):
+        self.assertIsInstance(get_json_codec(), StdlibJSONCodec)
+
+    def test_setting_changed(self):
+        with override_settings(
+            JSON_CODEC="apps.utils.tests.test_json_codecs.CountingJSONCodec"
+        ):
+            self.assertIsInstance(get_json_codec(), CountingJSONCodec)
+        self.assertNotIsInstance(get_json_codec(), CountingJSONCodec)
+
+    def test_encoder(self):
+        encoder = CodecJSONEncoder()
+        self.assertEqual(encoder.encode({"a": [1, 2.5]}), '{"a": [1, 2.5]}')
+        encoder = CodecJSONEncoder(sort_keys=True)
+        self.assertEqual(encoder.encode({"b": 1, "a": 2}), '{"a": 2, "b": 1}')
+
+    @override_settings(JSON_CODEC="apps.utils.tests.test_json_codecs.CountingJSONCodec")
+    def test_formfield_parses_once(self):
+        CountingJSONCodec.loads_count = 0
+        field = JSONObjectFormField()
+        data = '{"a": 1}'
+        self.assertEqual(field.prepare_value(field.bound_data(data, None)), data)
+        self.assertEqual(field.clean(data), {"a": 1})
+        self.assertEqual(CountingJSONCodec.loads_count, 1)
+
+    def test_formfield_cleaned_data_not_rendered(self):
+        class Form(forms.Form):
+            settings = JSONObjectFormField()
+
+            def clean_settings(self):
+                value = self.cleaned_data["settings"]
+                value["b"] = 2
+                return value
+
+        form = Form({"settings": '{"a": 1}'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["settings"], {"a": 1, "b": 2})
+        self.assertEqual(form["settings"].value(), '{"a": 1}')
+
+    def test_formfield_non_ascii(self):
+        class Form(forms.Form):
+            settings = JSONObjectFormField()
+
+        form = Form(initial={"settings": {"name": "café"}})
+        self.assertEqual(form["settings"].value(), '{"name": "café"}')
+        self.assertIn("café", str(form["settings"]))
+        form = Form({"settings": form["settings"].value()})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["settings"], {"name": "café"})
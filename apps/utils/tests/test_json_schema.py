@@ -0,0 +1,96 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from apps.utils.json_schema import (
+    SchemaValidationError,
+    compile_schema,
+    get_schema_validator,
+)
+
+
+SCHEMA = {
+    "title": "Person",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 5},
+        "age": {"type": "integer", "minimum": 0},
+        "email": {"type": ["string", "null"], "pattern": "@"},
+        "tags": {
+            "type": "array",
+            "items": {"enum": ["a", "b"]},
+            "maxItems": 2,
+            "uniqueItems": True,
+        },
+    },
+    "required": ["name"],
+    "additionalProperties": False,
+}
+
+
+class CompileSchemaTest(SimpleTestCase):
+
+    def test_valid_value(self):
+        validate = compile_schema(SCHEMA)
+        input_values = [
+            {"name": "a"},
+            {"name": "abcde", "age": 0, "email": None, "tags": ["a", "b"]},
+            {"name": "a", "age": 1.0},
+            {"name": "a", "email": "a@b.c", "tags": []},
+        ]
+        for input_value in input_values:
+            with self.subTest(input_value=input_value):
+                validate(input_value)
+
+    def test_invalid_value(self):
+        validate = compile_schema(SCHEMA)
+        input_values = [
+            ([], "Expected object."),
+            ({}, "Missing required property 'name'."),
+            ({"name": ""}, "name: Expected at least 1 characters."),
+            ({"name": "abcdef"}, "name: Expected at most 5 characters."),
+            ({"name": "a", "age": 1.5}, "age: Expected integer."),
+            ({"name": "a", "age": True}, "age: Expected integer."),
+            ({"name": "a", "age": -1}, "age: Expected a minimum of 0."),
+            ({"name": "a", "email": "a"}, "email: Expected to match '@'."),
+            ({"name": "a", "tags": ["c"]}, 'tags/0: Expected one of "a", "b".'),
+            ({"name": "a", "tags": ["a", "a"]}, "tags: Expected unique items."),
+            ({"name": "a", "tags": ["a"] * 3}, "tags: Expected at most 2 items."),
+            ({"name": "a", "other": 1}, "Unexpected property 'other'."),
+        ]
+        for input_value, message in input_values:
+            with self.subTest(input_value=input_value):
+                with self.assertRaises(SchemaValidationError) as ctx:
+                    validate(input_value)
+                self.assertEqual(str(ctx.exception), message)
+
+    def test_unsupported_keyword(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'oneOf'"):
+            compile_schema({"oneOf": []})
+
+    def test_unsupported_type(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'float'"):
+            compile_schema({"type": ["number", "float"]})
+
+    def test_enum_types(self):
+        validate = compile_schema({"enum": [1, [True], {"a": 0}]})
+        for input_value in [1, 1.0, [True], {"a": 0}]:
+            with self.subTest(input_value=input_value):
+                validate(input_value)
+        for input_value in [True, [1], {"a": False}, {"a": 0, "b": 0}]:
+            with self.subTest(input_value=input_value):
+                with self.assertRaises(SchemaValidationError):
+                    validate(input_value)
+
+    def test_const_bool(self):
+        validate = compile_schema({"const": False})
+        validate(False)
+        with self.assertRaises(SchemaValidationError):
+            validate(0)
+
+    def test_get_schema_validator(self):
+        validator = get_schema_validator({"type": "object", "required": ["a"]})
+        self.assertIs(
+            get_schema_validator({"required": ["a"], "type": "object"}), validator
+        )
+        self.assertIs(get_schema_validator(validator), validator)
+        self.assertIsNone(get_schema_validator(None))
@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+from logging.handlers import QueueListener
+
+from django.core import mail
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.utils.log import AdminEmailHandler, QueueHandler, RateLimitFilter
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self, block=None):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+        self.block = block
+
+    def emit(self, record):
+        if self.block is not None:
+            self.block.wait()
+        self.records.append(record)
+        self.threads.add(threading.current_thread())
+
+
+def make_record(msg="Error", lineno=1, exc_info=None):
+    return logging.LogRecord(
+        "test", logging.ERROR, "test.py", lineno, msg, (), exc_info
+    )
+
+
+def get_exc_info(exc_type=ValueError):
+    try:
+        raise exc_type
+    except exc_type as e:
+        return (type(e), e, e.__traceback__)
+
+
+class QueueHandlerTest(SimpleTestCase):
+
+    def make_logger(self, *handlers, maxsize=100):
+        handler = QueueHandler(queue.Queue(maxsize))
+        handler.listener = QueueListener(
+            handler.queue, *handlers, respect_handler_level=True
+        )
+        self.addCleanup(handler.stop_listener)
+        logger = logging.getLogger("apps.utils.tests.test_log")
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        return logger, handler
+
+    def test_handled_in_background(self):
+        target = RecordingHandler()
+        logger, handler = self.make_logger(target)
+        try:
+            raise ValueError
+        except ValueError:
+            logger.exception("Error %s", "message")
+        handler.stop_listener()
+        [record] = target.records
+        self.assertEqual(record.getMessage(), "Error message")
+        # The traceback is formatted, without keeping its frames alive
+        self.assertIsNone(record.exc_info)
+        self.assertIn("ValueError", record.exc_text)
+        self.assertNotIn(threading.current_thread(), target.threads)
+
+    def test_full_queue(self):
+        block = threading.Event()
+        target = RecordingHandler(block)
+        logger, handler = self.make_logger(target, maxsize=1)
+        for i in range(5):
+            logger.error("Error %s", i)
+        block.set()
+        handler.stop_listener()
+        self.assertLess(len(target.records), 5)
+
+    @override_settings(
+        ADMINS=[("Admin", "admin@example.com")],
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    )
+    def test_admin_email(self):
+        mail_admins = AdminEmailHandler(include_html=True)
+        logger, handler = self.make_logger(mail_admins)
+        handler.addFilter(RateLimitFilter())
+        request = RequestFactory().get("/path/")
+        for _ in range(10):
+            try:
+                raise ValueError
+            except ValueError:
+                logger.exception("Error", extra={"request": request})
+        handler.stop_listener()
+        self.assertEqual(len(mail.outbox), 1)
+        [email] = mail.outbox
+        self.assertIn("ValueError", email.body)
+        self.assertIn("/path/", email.body)
+
+    @override_settings(ADMINS=[("Admin", "admin@example.com")])
+    def test_prepare_drops_request(self):
+        mail_admins = AdminEmailHandler()
+        logger, handler = self.make_logger(mail_admins)
+        record = make_record(exc_info=get_exc_info())
+        record.request = RequestFactory().get("/path/")
+        prepared = handler.prepare(record)
+        self.assertNotIn("request", prepared.__dict__)
+        self.assertIsNone(prepared.exc_info)
+        (subject, message), kwargs = prepared.admin_email
+        self.assertIn("ERROR", subject)
+        self.assertIn("/path/", message)
+        # The original record is left as it was
+        self.assertIsNotNone(record.exc_info)
+
+
+class RateLimitFilterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.filter = RateLimitFilter(rate=2, total_rate=5, period=60)
+        self.time = 0
+        self.filter.now = lambda: self.time
+
+    def test_rate(self):
+        results = [self.filter.filter(make_record()) for _ in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertIs(self.filter.filter(make_record(lineno=2)), True)
+
+        self.time = 60
+        record = self.filter.filter(make_record())
+        self.assertEqual(record.getMessage(), "Error (2 similar records suppressed)")
+        self.assertIs(self.filter.filter(make_record()), True)
+        self.assertIs(self.filter.filter(make_record()), False)
+
+    def test_total_rate(self):
+        results = [self.filter.filter(make_record(lineno=i)) for i in range(7)]
+        self.assertEqual(results, [True] * 5 + [False] * 2)
+
+    def test_exceptions(self):
+        exc_info = get_exc_info()
+        for lineno in range(2):
+            # Logged from different places, but raised at the same one
+            self.assertIs(
+                self.filter.filter(make_record(lineno=lineno, exc_info=exc_info)),
+                True,
+            )
+        self.assertIs(self.filter.filter(make_record(exc_info=exc_info)), False)
+        self.assertIs(
+            self.filter.filter(make_record(exc_info=get_exc_info(KeyError))), True
+        )
@@ -0,0 +1,126 @@
+from email import message_from_bytes
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings
+
+from apps.utils.mail import get_queued_email_backend, serialize_message
+from apps.utils.tasks import send_emails
+
+from .ses import InMemorySESBackend
+
+
+@override_settings(
+    EMAIL_BACKEND="apps.utils.mail.CeleryEmailBackend",
+    QUEUED_EMAIL_BACKEND="apps.utils.tests.ses.InMemorySESBackend",
+    CELERY_TASK_ALWAYS_EAGER=True,
+)
+class CeleryEmailBackendTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_queued_email_backend.cache_clear()
+        InMemorySESBackend.clients.clear()
+        InMemorySESBackend.errors.clear()
+
+    def send(self, *recipients):
+        with self.captureOnCommitCallbacks(execute=True):
+            for recipient in recipients:
+                message = EmailMultiAlternatives(
+                    "Subject", "Body", "from@example.com", [recipient]
+                )
+                message.attach_alternative("<p>Body</p>", "text/html")
+                message.send()
+
+    def get_sent(self):
+        return [
+            message for client in InMemorySESBackend.clients for message in client.sent
+        ]
+
+    def test_send(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            mail.send_mail("Subject", "Body", "from@example.com", ["to@example.com"])
+        # Nothing is sent before the transaction commits
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.get_sent(), [])
+
+        self.send("to@example.com")
+        [sent] = self.get_sent()
+        self.assertEqual(sent["Source"], "from@example.com")
+        self.assertEqual(sent["Destinations"], ["to@example.com"])
+        message = message_from_bytes(sent["RawMessage"]["Data"])
+        self.assertEqual(message["Subject"], "Subject")
+        self.assertEqual(
+            [part.get_content_type() for part in message.walk()],
+            ["multipart/alternative", "text/plain", "text/html"],
+        )
+
+    def test_connection_reused(self):
+        self.send("a@example.com", "b@example.com")
+        self.send("c@example.com")
+        self.assertEqual(len(InMemorySESBackend.clients), 1)
+        self.assertEqual(len(self.get_sent()), 3)
+
+    def test_retry(self):
+        InMemorySESBackend.errors.extend([Exception("Throttling"), OSError()])
+        with self.assertLogs("apps.utils.tasks", "ERROR"):
+            self.send("a@example.com", "b@example.com", "c@example.com")
+        # Failed messages are retried over a new connection
+        self.assertEqual(len(InMemorySESBackend.clients), 3)
+        self.assertEqual(
+            sorted(sent["Destinations"][0] for sent in self.get_sent()),
+            ["a@example.com", "b@example.com", "c@example.com"],
+        )
+
+    def test_give_up(self):
+        InMemorySESBackend.errors.extend(
+            [Exception("Rejected")] * (send_emails.max_retries + 1)
+        )
+        with self.assertLogs("apps.utils.tasks", "ERROR") as logs:
+            self.send("a@example.com")
+        self.assertEqual(self.get_sent(), [])
+        self.assertIn("Gave up sending 1 email(s)", logs.output[-1])
+
+    def test_batch(self):
+        messages = [
+            ("Subject", "Body", "from@example.com", ["%s@example.com" % name])
+            for name in "abc"
+        ]
+        with mock.patch.object(
+            send_emails, "apply_async", wraps=send_emails.apply_async
+        ) as apply_async, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mail.send_mass_mail(messages), 3)
+        # One task for the messages of a send_messages() call
+        apply_async.assert_called_once()
+        self.assertEqual(len(self.get_sent()), 3)
+
+    def test_redelivered(self):
+        messages = [
+            serialize_message(mail.EmailMessage(to=["%s@example.com" % name]))
+            for name in "ab"
+        ]
+        InMemorySESBackend.errors.append(Exception("Throttling"))
+        with self.assertLogs("apps.utils.tasks", "ERROR"):
+            send_emails.apply((messages,))
+        self.assertEqual(len(self.get_sent()), 2)
+        # e.g. the worker was lost before acknowledging the task
+        send_emails.apply((messages,))
+        self.assertEqual(len(self.get_sent()), 2)
+
+    def test_fail_silently(self):
+        with mock.patch.object(
+            send_emails, "apply_async", side_effect=ConnectionError
+        ), self.captureOnCommitCallbacks(execute=True):
+            mail.send_mail(
+                "Subject",
+                "Body",
+                "from@example.com",
+                ["to@example.com"],
+                fail_silently=True,
+            )
+        with self.assertRaises(ConnectionError), mock.patch.object(
+            send_emails, "apply_async", side_effect=ConnectionError
+        ), self.captureOnCommitCallbacks(execute=True):
+            mail.send_mail("Subject", "Body", "from@example.com", ["to@example.com"])
@@ -1,6 +1,15 @@
+import copy
+import datetime
+import io
+import json
+import pickle
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
-from django.core.exceptions import ValidationError
-from django.db import connection, IntegrityError
+from django.core.exceptions import FieldError, ValidationError
+from django.db import connection, models, IntegrityError
+from django.db.models import signals
 from django.db.models.base import ModelBase
 from django.utils import timezone
 
@@ -10,9 +19,41 @@ from apps.utils.models import (
     JSONArrayField,
     JSONArrayFormField,
     CreatedModifiedModel,
+    JSONManager,
+    LazyJSON,
 )
 
 
+class TrackedCreatedModifiedModel(CreatedModifiedModel):
+    name = models.CharField(max_length=30, blank=True)
+    data = JSONObjectField(default=dict)
+    lazy_data = JSONObjectField(default=dict, lazy=True)
+
+    track_changes = True
+
+    class Meta:
+        abstract = True
+
+
+class LazyJSONModel(models.Model):
+    data = JSONObjectField(default=dict, lazy=True)
+    tags = JSONArrayField(default=list)
+
+    objects = JSONManager()
+
+    class Meta:
+        abstract = True
+
+
+class CompressedJSONModel(models.Model):
+    data = JSONObjectField(null=True, compression="zlib")
+
+    objects = JSONManager()
+
+    class Meta:
+        abstract = True
+
+
 class ModelMixinTestCase(TestCase):
     # Source: https://stackoverflow.com/a/45239964/3769045
     mixins = ()
@@ -97,6 +138,324 @@ class CreatedModifiedModelTest(ModelMixinTestCase):
         self.assertIsNotNone(obj.modified_at)
         self.assertTrue(obj.created_at <= obj.modified_at)
 
+    def test_bulk_create_custom_created_at(self):
+        custom_ts = timezone.now() - datetime.timedelta(days=1)
+        self.Model.objects.bulk_create(
+            [self.Model(created_at=custom_ts), self.Model(created_at=custom_ts)]
+        )
+        for obj in self.Model.objects.all():
+            with self.subTest(pk=obj.pk):
+                self.assertEqual(obj.created_at, custom_ts)
+                self.assertEqual(obj.modified_at, custom_ts)
+
+    def test_bulk_update(self):
+        self.Model.objects.bulk_create([self.Model(), self.Model()])
+        objs = list(self.Model.objects.all())
+        with self.assertNumQueries(1):
+            self.Model.objects.bulk_update(objs, ["created_at"])
+        for obj in self.Model.objects.all():
+            with self.subTest(pk=obj.pk):
+                self.assertTrue(obj.modified_at > obj.created_at)
+                self.assertEqual(obj.modified_at, objs[0].modified_at)
+
+    def test_bulk_update_custom_modified_at(self):
+        custom_ts = timezone.now() - datetime.timedelta(days=1)
+        self.Model.objects.bulk_create([self.Model(), self.Model()])
+        objs = list(self.Model.objects.all())
+        for obj in objs:
+            obj.modified_at = custom_ts
+        self.Model.objects.bulk_update(objs, ["modified_at"])
+        for obj in self.Model.objects.all():
+            with self.subTest(pk=obj.pk):
+                self.assertEqual(obj.modified_at, custom_ts)
+
+    def test_queryset_update(self):
+        self.Model.objects.bulk_create([self.Model(), self.Model()])
+        with self.assertNumQueries(1):
+            self.Model.objects.update()
+        for obj in self.Model.objects.all():
+            with self.subTest(pk=obj.pk):
+                self.assertTrue(obj.modified_at > obj.created_at)
+
+    def test_queryset_update_custom_modified_at(self):
+        custom_ts = timezone.now() - datetime.timedelta(days=1)
+        self.Model.objects.bulk_create([self.Model()])
+        self.Model.objects.update(modified_at=custom_ts)
+        obj = self.Model.objects.get()
+        self.assertEqual(obj.modified_at, custom_ts)
+
+    def test_update_fields(self):
+        obj = self.Model()
+        # Create
+        obj.save()
+        # Update
+        obj.save(update_fields=[])
+        self.assertEqual(obj.modified_at, obj.created_at)
+        obj.save(update_fields=["created_at"])
+        obj.refresh_from_db()
+        self.assertTrue(obj.modified_at > obj.created_at)
+
+    def test_changed_since(self):
+        ts = timezone.now()
+        # Some rows share the same modified_at
+        self.Model.objects.bulk_create([self.Model(created_at=ts) for _ in range(3)])
+        self.Model.objects.bulk_create([self.Model() for _ in range(4)])
+        self.Model.objects.create(created_at=ts - datetime.timedelta(days=1))
+        pks = []
+        page = list(self.Model.objects.changed_since(ts, limit=2))
+        while page:
+            pks.extend(obj.pk for obj in page)
+            last = page[-1]
+            page = list(
+                self.Model.objects.changed_since(last.modified_at, last.pk, limit=2)
+            )
+        expected_pks = list(
+            self.Model.objects.filter(modified_at__gte=ts)
+            .order_by("modified_at", "pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(len(expected_pks), 7)
+        self.assertEqual(pks, expected_pks)
+
+
+class TrackedCreatedModifiedModelTest(ModelMixinTestCase):
+    mixins = (TrackedCreatedModifiedModel,)
+
+    def setUp(self):
+        self.Model.objects.create(name="a")
+        self.obj = self.Model.objects.get()
+        self.saved_update_fields = []
+        signals.post_save.connect(self.on_post_save, sender=self.Model)
+        self.addCleanup(
+            signals.post_save.disconnect, self.on_post_save, sender=self.Model
+        )
+
+    def on_post_save(self, sender, instance, update_fields, **kwargs):
+        self.saved_update_fields.append(update_fields)
+
+    def test_save_unchanged(self):
+        modified_at = self.obj.modified_at
+        self.assertEqual(self.obj.get_changed_fields(), [])
+        with self.assertNumQueries(0):
+            self.obj.save()
+        self.assertEqual(self.obj.modified_at, modified_at)
+        self.assertEqual(self.saved_update_fields, [])
+
+    def test_save_changed(self):
+        self.obj.name = "b"
+        self.assertEqual(self.obj.get_changed_fields(), ["name"])
+        with self.assertNumQueries(1):
+            self.obj.save()
+        self.assertEqual(self.saved_update_fields, [{"name", "modified_at"}])
+        self.assertEqual(self.obj.get_changed_fields(), [])
+        obj = self.Model.objects.get()
+        self.assertEqual(obj.name, "b")
+        self.assertTrue(obj.modified_at > obj.created_at)
+
+    def test_save_changed_in_place(self):
+        self.obj.data["a"] = 1
+        self.assertEqual(self.obj.get_changed_fields(), ["data"])
+        self.obj.save()
+        self.assertEqual(self.Model.objects.get().data, {"a": 1})
+
+    def test_save_changed_in_place_lazy(self):
+        self.assertEqual(self.obj.get_changed_fields(), [])
+        self.obj.lazy_data["a"] = 1
+        self.assertEqual(self.obj.get_changed_fields(), ["lazy_data"])
+        self.obj.save()
+        self.assertEqual(self.Model.objects.get().lazy_data, {"a": 1})
+
+    def test_save_deferred(self):
+        obj = self.Model.objects.only("name").get()
+        self.assertEqual(obj.get_changed_fields(), [])
+        obj.data = {"a": 1}
+        self.assertEqual(obj.get_changed_fields(), ["data"])
+        obj.save()
+        self.assertEqual(self.saved_update_fields, [{"data", "modified_at"}])
+
+    def test_refresh_from_db(self):
+        self.obj.name = "b"
+        self.obj.refresh_from_db()
+        self.assertEqual(self.obj.get_changed_fields(), [])
+
+    def test_untracked(self):
+        obj = self.Model(name="c")
+        self.assertIsNone(obj.get_changed_fields())
+        obj.save()
+        self.assertEqual(obj.get_changed_fields(), [])
+
+
+class LazyJSONModelTest(ModelMixinTestCase):
+    mixins = (LazyJSONModel,)
+
+    def setUp(self):
+        self.Model.objects.create(data={"a": 1, "b": {"c": [2]}}, tags=["x"])
+
+    def test_lazy_attribute(self):
+        obj = self.Model.objects.get()
+        self.assertIsInstance(obj.__dict__["data"], LazyJSON)
+        self.assertIsInstance(obj.__dict__["tags"], list)
+        self.assertEqual(obj.data, {"a": 1, "b": {"c": [2]}})
+        self.assertIs(type(obj.data), dict)
+        self.assertIs(obj.__dict__["data"], obj.data)
+
+    def test_lazy_save(self):
+        obj = self.Model.objects.get()
+        obj.save()
+        obj.data["a"] = 2
+        obj.save()
+        self.assertEqual(self.Model.objects.get().data["a"], 2)
+
+    def test_lazy_values(self):
+        value = {"a": 1, "b": {"c": [2]}}
+        data = self.Model.objects.values_list("data", flat=True).get()
+        self.assertIs(type(data), dict)
+        self.assertEqual(data, value)
+        row = self.Model.objects.values("data", "tags").get()
+        self.assertEqual(row, {"data": value, "tags": ["x"]})
+        self.assertIs(type(row["data"]), dict)
+        row = self.Model.objects.values_list("data", "tags").get()
+        self.assertEqual(row, (value, ["x"]))
+        self.assertIs(type(row[0]), dict)
+        row = self.Model.objects.values_list("data", named=True).get()
+        self.assertIs(type(row.data), dict)
+
+    def test_lazy_json_proxy(self):
+        data = LazyJSON('{"a": 1, "b": 2}', json.loads)
+        self.assertEqual(data["a"], 1)
+        self.assertIn("b", data)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(list(data.keys()), ["a", "b"])
+        self.assertEqual(data, {"a": 1, "b": 2})
+
+    def test_lazy_json_copy_pickle(self):
+        data = LazyJSON('{"a": [1]}', json.loads)
+        for copied in [
+            copy.copy(data),
+            copy.deepcopy(data),
+            pickle.loads(pickle.dumps(data)),
+        ]:
+            with self.subTest(copied=copied):
+                self.assertIsInstance(copied, LazyJSON)
+                self.assertEqual(copied, {"a": [1]})
+                self.assertIsNot(copied.value, data.value)
+        with self.assertRaises(AttributeError):
+            data.__missing__
+
+    def test_lazy_model_copy(self):
+        obj = self.Model.objects.get()
+        copied = copy.deepcopy(obj)
+        self.assertIsInstance(copied.__dict__["data"], LazyJSON)
+        self.assertEqual(copied.data, {"a": 1, "b": {"c": [2]}})
+        self.assertIsNot(copied.data, obj.data)
+        data = self.Model.objects.get().__dict__["data"]
+        self.assertEqual(pickle.loads(pickle.dumps(data)), {"a": 1, "b": {"c": [2]}})
+
+    def test_lazy_manager_check(self):
+        field = self.Model._meta.get_field("data")
+        self.assertEqual(field.check(), [])
+        with mock.patch.object(
+            type(self.Model._default_manager),
+            "get_queryset",
+            lambda manager: models.QuerySet(self.Model),
+        ):
+            [error] = field.check()
+        self.assertEqual(error.id, "utils.E001")
+
+    def test_lazy_key_transform(self):
+        a = self.Model.objects.values_list("data__a", flat=True).get()
+        self.assertEqual(a, 1)
+
+    def test_with_json_keys(self):
+        obj = self.Model.objects.with_json_keys(a="data__a", c="data__b__c").get()
+        self.assertEqual(obj.get_deferred_fields(), {"data"})
+        self.assertEqual(obj.a, 1)
+        self.assertEqual(obj.c, "[2]")
+
+    def test_deconstruct(self):
+        field = self.Model._meta.get_field("data")
+        name, path, args, kwargs = field.deconstruct()
+        self.assertIs(kwargs["lazy"], True)
+
+
+class CompressedJSONModelTest(ModelMixinTestCase):
+    mixins = (CompressedJSONModel,)
+    large_value = {"key%s" % i: "value" for i in range(100)}
+
+    def get_raw_values(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT data FROM %s ORDER BY id"
+                % connection.ops.quote_name(self.Model._meta.db_table)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_compressed(self):
+        self.Model.objects.create(data=self.large_value)
+        [raw_value] = self.get_raw_values()
+        self.assertTrue(raw_value.startswith('"zlib:1:'))
+        self.assertLess(len(raw_value), len(json.dumps(self.large_value)) / 2)
+        self.assertEqual(self.Model.objects.get().data, self.large_value)
+
+    def test_small_value(self):
+        self.Model.objects.create(data={"a": 1})
+        self.assertEqual(self.get_raw_values(), ['{"a": 1}'])
+        self.assertEqual(self.Model.objects.get().data, {"a": 1})
+
+    def test_invalid_envelope(self):
+        field = self.Model._meta.get_field("data")
+        for raw_value in ['"zlib:1:hello"', '"zlib:1:aGVsbG8="']:
+            with self.subTest(raw_value=raw_value):
+                self.assertEqual(field.decode(raw_value), raw_value)
+        # Strings that look like envelopes in uncompressed fields
+        field = JSONObjectField()
+        self.assertEqual(field.decode('"zlib:1:aGVsbG8="'), "zlib:1:aGVsbG8=")
+
+    def test_null_value(self):
+        self.Model.objects.create(data=None)
+        self.assertEqual(self.get_raw_values(), [None])
+
+    def test_compressjsonfields(self):
+        with connection.cursor() as cursor:
+            for _ in range(3):
+                cursor.execute(
+                    "INSERT INTO %s (data) VALUES (%%s)"
+                    % connection.ops.quote_name(self.Model._meta.db_table),
+                    [json.dumps(self.large_value)],
+                )
+        stdout = io.StringIO()
+        call_command(
+            "compressjsonfields",
+            self.Model._meta.label,
+            batch_size=2,
+            stdout=stdout,
+        )
+        self.assertIn("Rewrote 3 ", stdout.getvalue())
+        for raw_value in self.get_raw_values():
+            self.assertTrue(raw_value.startswith('"zlib:1:'))
+        for obj in self.Model.objects.all():
+            self.assertEqual(obj.data, self.large_value)
+
+    def test_lookups(self):
+        self.Model.objects.create(data=self.large_value)
+        self.Model.objects.create(data=None)
+        self.assertEqual(self.Model.objects.filter(data__isnull=True).count(), 1)
+        msg = "Compressed JSON field 'data' can't be queried."
+        querysets = [
+            lambda: self.Model.objects.filter(data={"a": 1}),
+            lambda: self.Model.objects.filter(data__key0="value"),
+            lambda: self.Model.objects.filter(data__has_key="key0"),
+            lambda: self.Model.objects.filter(data__contains={"key0": "value"}),
+            lambda: self.Model.objects.with_json_keys(key="data__key0"),
+        ]
+        for queryset in querysets:
+            with self.assertRaisesMessage(FieldError, msg):
+                queryset()
+
+    def test_unknown_compression(self):
+        with self.assertRaisesMessage(ValueError, "Unknown compression: 'lzma'"):
+            JSONObjectField(compression="lzma")
+
 
 class JSONObjectFieldTest(TestCase):
 
@@ -182,6 +541,39 @@ class JSONObjectFieldTest(TestCase):
         form_field = model_field.formfield()
         self.assertEqual(form_field.required, False)
 
+    def test_schema(self):
+        field = JSONObjectField(
+            schema={"properties": {"a": {"type": "integer"}}, "required": ["a"]}
+        )
+        self.assertEqual(field.clean({"a": 1}, None), {"a": 1})
+        input_values = [
+            ({}, "Value does not match the schema: Missing required property 'a'."),
+            ({"a": "1"}, "Value does not match the schema: a: Expected integer."),
+            ([], "Value must be a valid JSON object."),
+        ]
+        for input_value, message in input_values:
+            with self.subTest(input_value=input_value):
+                with self.assertRaises(ValidationError) as ctx:
+                    field.clean(input_value, None)
+                self.assertEqual(ctx.exception.messages, [message])
+
+    def test_schema_formfield(self):
+        model_field = JSONObjectField(schema={"required": ["a"]})
+        form_field = model_field.formfield()
+        self.assertEqual(form_field.clean('{"a": 1}'), {"a": 1})
+        with self.assertRaisesMessage(
+            ValidationError, "Missing required property 'a'."
+        ):
+            form_field.clean("{}")
+
+    def test_schema_deconstruct(self):
+        schema = {"required": ["a"]}
+        name, path, args, kwargs = JSONObjectField(schema=schema).deconstruct()
+        self.assertEqual(kwargs["schema"], schema)
+        field = JSONObjectField(schema=lambda value: None)
+        name, path, args, kwargs = field.deconstruct()
+        self.assertNotIn("schema", kwargs)
+
 
 class JSONObjectFormFieldTest(TestCase):
 
@@ -315,6 +707,16 @@ class JSONArrayFieldTest(TestCase):
         form_field = model_field.formfield()
         self.assertEqual(form_field.required, False)
 
+    def test_schema(self):
+        field = JSONArrayField(schema={"items": {"type": "string"}})
+        self.assertEqual(field.clean(["a"], None), ["a"])
+        with self.assertRaises(ValidationError) as ctx:
+            field.clean(["a", 1], None)
+        self.assertEqual(
+            ctx.exception.messages,
+            ["Value does not match the schema: 1: Expected string."],
+        )
+
 
 class JSONArrayFormFieldTest(TestCase):
 
@@ -0,0 +1,70 @@
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.accounts.models import User
+from apps.utils.middleware import ReplicaPinningMiddleware
+from apps.utils.routers import ReplicaRouter, use_primary
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def get_response(self, request):
+        response = HttpResponse()
+        response.read_db = self.router.db_for_read(User)
+        if request.method == "POST":
+            self.router.db_for_write(User)
+        return response
+
+    def test_read(self):
+        middleware = ReplicaPinningMiddleware(self.get_response)
+        response = middleware(self.factory.get("/"))
+        self.assertEqual(response.read_db, "replica")
+        self.assertNotIn(middleware.cookie_name, response.cookies)
+
+    def test_read_after_write(self):
+        middleware = ReplicaPinningMiddleware(self.get_response)
+        response = middleware(self.factory.post("/"))
+        self.assertEqual(response.read_db, "replica")
+        self.assertIn(middleware.cookie_name, response.cookies)
+        # Pinning doesn't leak out of the request
+        self.assertEqual(self.router.db_for_read(User), "replica")
+
+        request = self.factory.get("/")
+        request.COOKIES[middleware.cookie_name] = "1"
+        response = middleware(request)
+        self.assertEqual(response.read_db, DEFAULT_DB_ALIAS)
+        self.assertNotIn(middleware.cookie_name, response.cookies)
+
+    async def test_read_after_write_async(self):
+        async def get_response(request):
+            # Like a query run from an async view
+            return await sync_to_async(self.get_response)(request)
+
+        middleware = ReplicaPinningMiddleware(get_response)
+        response = await middleware(self.factory.post("/"))
+        self.assertIn(middleware.cookie_name, response.cookies)
+        self.assertEqual(self.router.db_for_read(User), "replica")
+
+        request = self.factory.get("/")
+        request.COOKIES[middleware.cookie_name] = "1"
+        response = await middleware(request)
+        self.assertEqual(response.read_db, DEFAULT_DB_ALIAS)
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(User), "replica")
+
+    def test_write(self):
+        self.assertEqual(self.router.db_for_write(User), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.utils.sessions import SessionStore
+from apps.utils.tasks import clear_expired_sessions
+
+
+class SessionStoreTest(TestCase):
+
+    def setUp(self):
+        caches["sessions"].clear()
+        self.session = SessionStore()
+        self.session["key"] = "value"
+        self.session.save()
+
+    def test_load_cached(self):
+        with self.assertNumQueries(0):
+            session = SessionStore(self.session.session_key)
+            self.assertEqual(session["key"], "value")
+
+    def test_load_from_database(self):
+        caches["sessions"].clear()
+        with self.assertNumQueries(1):
+            session = SessionStore(self.session.session_key)
+            self.assertEqual(session["key"], "value")
+
+    def test_save_unchanged(self):
+        session = SessionStore(self.session.session_key)
+        session["key"] = "value"
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_save_changed(self):
+        session = SessionStore(self.session.session_key)
+        session["key"] = "changed"
+        session.save()
+        caches["sessions"].clear()
+        self.assertEqual(SessionStore(self.session.session_key)["key"], "changed")
+        # Unchanged since the last save
+        with self.assertNumQueries(0):
+            session.save()
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_save_unchanged_every_request(self):
+        session = SessionStore(self.session.session_key)
+        session["key"] = "value"
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertTrue(queries.captured_queries)
+
+    def test_clear_expired(self):
+        Session.objects.bulk_create(
+            Session(
+                session_key="expired%s" % i,
+                session_data="",
+                expire_date=timezone.now() - timedelta(days=1),
+            )
+            for i in range(5)
+        )
+        with self.assertNumQueries(3 * 2 + 1):
+            self.assertEqual(SessionStore.clear_expired(batch_size=2), 5)
+        self.assertQuerySetEqual(
+            Session.objects.values_list("pk", flat=True),
+            [self.session.session_key],
+        )
+
+    def test_clear_expired_sessions(self):
+        Session.objects.filter(pk=self.session.session_key).update(
+            expire_date=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(clear_expired_sessions(), 1)
+        self.assertFalse(Session.objects.exists())
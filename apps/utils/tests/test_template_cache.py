@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+
+from apps.utils.template_cache import compile_templates
+
+
+class CompileTemplatesTest(SimpleTestCase):
+
+    def test_compile_templates(self):
+        compiled, errors = compile_templates()
+        self.assertEqual(errors, {})
+        for name in [
+            "site/home.html",
+            "site/partials/meta.html",
+            "admin/accounts/user/add_form.html",
+            "admin/base.html",
+        ]:
+            self.assertIn(name, compiled)
@@ -16,6 +16,24 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@app.on_after_configure.connect
+def create_filesystem_folders(sender, **kwargs):
+    """
+    Create the folders of the filesystem broker & file result backend, which
+    don't create them themselves.
+    """
+    folders = []
+    if sender.conf.broker_url.startswith("filesystem://"):
+        options = sender.conf.broker_transport_options
+        for option in ["data_folder_in", "data_folder_out", "control_folder"]:
+            if option in options:
+                folders.append(options[option])
+    if (sender.conf.result_backend or "").startswith("file://"):
+        folders.append(sender.conf.result_backend.removeprefix("file://"))
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print("Request: {0!r}".format(self.request))
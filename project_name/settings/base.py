@@ -49,10 +49,17 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = "accounts.User"
 AUTHENTICATION_BACKENDS = ["apps.accounts.backends.ModelBackend"]
+# How long the authentication backend caches the user of a session. Set to 0
+# to fetch the user from the database on every request.
+AUTH_USER_CACHE_SECONDS = 60 * 5
+# How long the authentication backend caches a user's permissions. Set to 0
+# to fetch them once per request instead.
+AUTH_PERMISSION_CACHE_SECONDS = 60 * 5
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "apps.utils.middleware.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -81,8 +88,14 @@ TEMPLATES = [
     },
 ]
 
+# Compile every template when the WSGI/ASGI application loads, so a worker's
+# first requests don't have to.
+TEMPLATES_PRELOAD = False
+
 WSGI_APPLICATION = "{{ project_name }}.wsgi.application"
 
+ASGI_APPLICATION = "{{ project_name }}.asgi.application"
+
 
 # Database
 # https://docs.djangoproject.com/en/{{ docs_version }}/ref/settings/#databases
@@ -94,6 +107,154 @@ DATABASES = {
     }
 }
 
+# Reads are sent to one of the DATABASE_REPLICAS aliases & writes to "default".
+# Mirror replicas to "default" in tests, e.g.:
+#   DATABASES["replica"] = {
+#       "ENGINE": "django.db.backends.sqlite3",
+#       "NAME": DATA_DIR / "replica.sqlite3",
+#       "TEST": {"MIRROR": "default"},
+#   }
+#   DATABASE_REPLICAS = ["replica"]
+DATABASE_REPLICAS = []
+# How long a client's reads stick to "default" after it writes something.
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_ROUTERS = ["apps.utils.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/{{ docs_version }}/topics/cache/
+
+# Once a file cache holds MAX_ENTRIES entries, set() deletes a random
+# 1/CULL_FREQUENCY of them, whatever their timeout. Django's default of 300
+# entries would keep evicting e.g. cached users, so each cache is sized for
+# what it holds. Every set() also lists the cache's directory, so use
+# Redis (see REDIS_URL below) once caches need to be much larger.
+CACHES = {
+    # Users & permissions. Also login rate limit counters with Redis: the file
+    # cache can't count atomically, so apps.accounts.ratelimit counts in the
+    # database instead.
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": DATA_DIR / "cache" / "default",
+        "OPTIONS": {"MAX_ENTRIES": 20000, "CULL_FREQUENCY": 10},
+    },
+    # Pages cached by apps.site. Kept apart so it can be cleared on its own.
+    "site": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": DATA_DIR / "cache" / "site",
+        "OPTIONS": {"MAX_ENTRIES": 2000, "CULL_FREQUENCY": 10},
+    },
+    # Sessions, also stored in the database, which is read again for sessions
+    # culled from the cache. A session per active visitor, so with many
+    # visitors this only saves database reads with Redis.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": DATA_DIR / "cache" / "sessions",
+        "OPTIONS": {"MAX_ENTRIES": 20000, "CULL_FREQUENCY": 10},
+    },
+}
+
+if os.environ.get("REDIS_URL"):
+    # e.g. redis://localhost:6379. Each cache gets its own Redis database so
+    # that clearing one doesn't clear the others.
+    for index, cache in enumerate(CACHES.values()):
+        # Redis evicts by its own maxmemory policy
+        cache.pop("OPTIONS", None)
+        cache.update(
+            {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "%s/%s" % (os.environ["REDIS_URL"], index),
+            }
+        )
+
+SITE_CACHE_SECONDS = 60 * 15
+
+
+# Sessions
+# https://docs.djangoproject.com/en/{{ docs_version }}/topics/http/sessions/
+
+# Read sessions from the "sessions" cache and write them through to the
+# database. Requests that don't use request.session don't touch either.
+SESSION_ENGINE = "apps.utils.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+
+# Keep sessions in signed cookies instead, so they need no storage at all.
+# Sessions then can't be revoked server-side and must stay under 4KB.
+if os.environ.get("SESSION_STORAGE") == "signed_cookies":
+    SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+
+# Celery
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html
+
+if os.environ.get("REDIS_URL"):
+    # After the Redis databases of CACHES
+    CELERY_BROKER_URL = "%s/%s" % (os.environ["REDIS_URL"], len(CACHES))
+    CELERY_RESULT_BACKEND = "%s/%s" % (os.environ["REDIS_URL"], len(CACHES) + 1)
+    # A task that isn't acknowledged within this many seconds is sent to
+    # another worker. Must be longer than the longest task takes.
+    CELERY_VISIBILITY_TIMEOUT = 60 * 60 * 6
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        "visibility_timeout": CELERY_VISIBILITY_TIMEOUT,
+    }
+else:
+    # Keep messages & results in files, in development & tests only: only
+    # workers on the same machine can use them, and a message is deleted as
+    # soon as a worker reads it, so it's lost if the worker is killed.
+    # prod.py requires REDIS_URL.
+    CELERY_BROKER_URL = "filesystem://"
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        "data_folder_in": str(DATA_DIR / "celery" / "messages"),
+        "data_folder_out": str(DATA_DIR / "celery" / "messages"),
+        "control_folder": str(DATA_DIR / "celery" / "control"),
+    }
+    CELERY_RESULT_BACKEND = "file://%s" % (DATA_DIR / "celery" / "results")
+
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+
+# Acknowledge messages after the task ran instead of before, so a task is
+# retried if its worker dies. Tasks must be safe to run more than once.
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Reserve one message per worker process at a time, so a message isn't stuck
+# behind a long task while other processes are idle. Workers of short tasks
+# can raise it with --prefetch-multiplier.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Send long running tasks to the "long" queue, which has workers of its own,
+# so they can't hold up the "default" queue.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "apps.utils.tasks.clear_expired_sessions": {"queue": "long"},
+}
+
+# Only store results of tasks created with ignore_result=False.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = 60 * 60 * 24
+
+CELERY_TASK_COMPRESSION = "gzip"
+CELERY_RESULT_COMPRESSION = "gzip"
+
+CELERY_BEAT_SCHEDULE = {
+    # Replaces running the clearsessions command
+    "clear-expired-sessions": {
+        "task": "apps.utils.tasks.clear_expired_sessions",
+        "schedule": 60 * 60,
+    },
+    "clear-expired-login-attempt-counts": {
+        "task": "apps.accounts.tasks.clear_expired_login_attempt_counts",
+        "schedule": 60 * 60,
+    },
+}
+
+
+# Email
+# https://docs.djangoproject.com/en/{{ docs_version }}/topics/email/
+
+# Backend that Celery workers send the messages queued by
+# apps.utils.mail.CeleryEmailBackend with.
+QUEUED_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/{{ docs_version }}/ref/settings/#auth-password-validators
@@ -114,6 +275,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/{{ docs_version }}/topics/auth/passwords/
+
+# Passwords a process hashes at once. Under ASGI, other logins wait instead
+# of using up the CPU & memory.
+PASSWORD_HASHING_CONCURRENCY = 4
+
+# Login attempts allowed per client IP address and per email address, as
+# (attempts, seconds). Attempts over the limit fail before hashing anything.
+LOGIN_RATE_LIMITS = {
+    "ip": (30, 60),
+    "email": (10, 60 * 5),
+}
+
+# request.META key of the header a proxy puts the client IP address in, if
+# any. Otherwise REMOTE_ADDR is used.
+CLIENT_IP_HEADER = None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/{{ docs_version }}/topics/i18n/
 
@@ -144,6 +324,12 @@ MEDIA_ROOT = os.environ.get("MEDIA_DIR", BASE_DIR / "media/")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# JSON codec used by apps.utils JSON fields. Leave unset to use the fastest
+# installed codec (orjson, then msgspec, then the standard library).
+
+JSON_CODEC = os.environ.get("JSON_CODEC")
+
+
 # Logging
 
 LOGGING = {
@@ -165,6 +351,13 @@ LOGGING = {
         "require_debug_true": {
             "()": "django.utils.log.RequireDebugTrue",
         },
+        # One email per kind of error every 5 minutes, and at most 10 overall
+        "rate_limit": {
+            "()": "apps.utils.log.RateLimitFilter",
+            "rate": 1,
+            "total_rate": 10,
+            "period": 60 * 5,
+        },
     },
     "handlers": {
         "console": {
@@ -174,8 +367,7 @@ LOGGING = {
         },
         "mail_admins": {
             "level": "ERROR",
-            "filters": ["require_debug_false"],
-            "class": "django.utils.log.AdminEmailHandler",
+            "class": "apps.utils.log.AdminEmailHandler",
             "include_html": True,
         },
         "file": {
@@ -186,13 +378,29 @@ LOGGING = {
             "backupCount": 1,
             "formatter": "verbose",
         },
+        # Sends error emails on a background thread, so that sending them
+        # doesn't hold up requests. Filtered here, so that records that won't
+        # be emailed aren't rendered or queued.
+        "queue": {
+            "level": "ERROR",
+            "filters": ["require_debug_false", "rate_limit"],
+            "class": "apps.utils.log.QueueHandler",
+            "handlers": ["mail_admins"],
+            "queue": {"()": "queue.Queue", "maxsize": 1000},
+            "respect_handler_level": True,
+        },
     },
     # Catch-all type logger
     "root": {
-        "handlers": ["console", "mail_admins", "file"],
+        "handlers": ["console", "file", "queue"],
         "level": "DEBUG",
     },
     "loggers": {
+        # Drop the handlers of Django's default config, one of which emails
+        # admins on the request thread, and propagate to the root logger.
+        "django": {
+            "level": "INFO",
+        },
         # https://github.com/ipython/ipython/issues/10946
         "parso": {
             "handlers": ["console"],
@@ -1,3 +1,5 @@
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 
@@ -9,7 +11,62 @@ ALLOWED_HOSTS = [
     "{{ project_name }}.com",
 ]
 
-EMAIL_BACKEND = "django_ses.SESBackend"
+# Database
+# https://docs.djangoproject.com/en/{{ docs_version }}/ref/databases/#sqlite-notes
+
+DATABASES["default"].update(
+    {
+        # Reuse connections across requests instead of reopening the file.
+        "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Run on every new connection.
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=134217728;"  # 128MB
+                "PRAGMA cache_size=-20000;"  # 20MB
+                "PRAGMA temp_store=MEMORY;"
+            ),
+            # Take the write lock at the start of a transaction so writers wait
+            # on the busy timeout instead of failing with "database is locked".
+            "transaction_mode": "IMMEDIATE",
+            # Seconds to wait for a lock.
+            "timeout": 20,
+        },
+    }
+)
+
+# Templates
+
+# Keep compiled templates in memory. This is Django's default when no loaders
+# are set, but is spelled out so it doesn't silently change.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+TEMPLATES_PRELOAD = True
+
+# Celery
+
+# The filesystem transport that base.py falls back to deletes each message as
+# soon as a worker reads it, so tasks of a killed worker would be lost, late
+# acknowledgement or not. It's only a stand-in for development & tests.
+if not os.environ.get("REDIS_URL"):
+    raise ImproperlyConfigured("Set REDIS_URL, Celery needs a Redis broker.")
+
+# Fly's proxy sets the client IP address in the Fly-Client-IP header
+CLIENT_IP_HEADER = "HTTP_FLY_CLIENT_IP"
+
+# Send emails from Celery workers, which keep their SES connection open
+EMAIL_BACKEND = "apps.utils.mail.CeleryEmailBackend"
+QUEUED_EMAIL_BACKEND = "django_ses.SESBackend"
 
 AWS_SES_ACCESS_KEY_ID = os.environ.get("AWS_SES_ACCESS_KEY_ID", "")
 AWS_SES_SECRET_ACCESS_KEY = os.environ.get("AWS_SES_SECRET_ACCESS_KEY", "")
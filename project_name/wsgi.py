@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "{{ project_name }}.settings.dev")
 
 application = get_wsgi_application()
+
+# Compile templates before serving any requests. Imported once Django is set
+# up, since the module uses the settings.
+from apps.utils.template_cache import preload_templates  # noqa: E402
+
+preload_templates()